@@ -0,0 +1,143 @@
+"""
+Offline intent classification for many conversations through the OpenAI Batch API.
+Meant for evaluation and bulk replay; the live chat path does not use it.
+"""
+
+import os
+import time
+import logging
+from typing import Dict, List, Optional
+
+import orjson
+from openai import OpenAI
+
+from backend.agent.booking_agent import (
+    AgentState,
+    new_agent_state,
+    get_llm,
+    JSON_RESPONSE_FORMAT,
+    INTENT_SYSTEM_PROMPT,
+    answer_locally,
+    append_fallback,
+    append_intent_response,
+    last_user_msg,
+    route_by_intent
+)
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def _batch_request(custom_id: str, system_prompt: str, user_message: str) -> bytes:
+    """Build one JSONL line of the batch input file."""
+    llm = get_llm()
+    return orjson.dumps({
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": {
+            "model": llm.model_name,
+            "temperature": llm.temperature,
+            "max_tokens": llm.max_tokens,
+            "response_format": JSON_RESPONSE_FORMAT,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_message}
+            ]
+        }
+    })
+
+
+def _parse_json_reply(content: Optional[str]) -> Optional[Dict]:
+    """Decode a JSON reply, or None if it is missing or malformed."""
+    if not content or not content.strip():
+        return None
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError as e:
+        logger.error("JSON decode error in batch reply: %s", e)
+        return None
+
+
+def batch_process_conversations(conversations: List[List[Dict]],
+                                poll_interval: float = 30.0,
+                                timeout: float = 24 * 60 * 60) -> List[AgentState]:
+    """Run intent understanding for many conversations in one batch job.
+
+    Each conversation gets the same treatment as understand_intent_node:
+    keyword and unambiguous messages are answered locally, the rest are sent
+    as one combined intent request each (intent plus extracted details) in a
+    single Batch API submission. Batch jobs are cheaper but can take up to 24
+    hours, and this function blocks the calling thread with time.sleep while
+    it polls, so it is only for offline scripts and CLI use, never the event
+    loop of the API server.
+
+    Args:
+        conversations: Message lists ({"role": ..., "content": ...}) to classify
+        poll_interval: Seconds between batch status checks
+        timeout: Seconds to wait for the batch before giving up
+
+    Returns:
+        One AgentState per conversation, in input order, with user_intent,
+        conversation_context, next_step and the assistant reply filled in
+    """
+    states = [new_agent_state(messages=list(messages)) for messages in conversations]
+
+    lines = []
+    pending = []
+    for index, state in enumerate(states):
+        last_user_message = last_user_msg(state)
+        if not last_user_message or answer_locally(state, last_user_message, state["messages"]):
+            continue
+        pending.append((index, last_user_message))
+        lines.append(_batch_request(f"intent-{index}", INTENT_SYSTEM_PROMPT, last_user_message))
+
+    if not lines:
+        return states
+
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    input_file = client.files.create(
+        file=("booking_batch.jsonl", b"\n".join(lines)),
+        purpose="batch"
+    )
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h"
+    )
+    logger.info("Submitted batch %s with %s requests", batch.id, len(lines))
+
+    deadline = time.monotonic() + timeout
+    while batch.status not in _FINAL_STATUSES:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Batch {batch.id} did not finish within {timeout} seconds")
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+
+    # Collect replies by custom_id; failed requests simply have no reply
+    replies: Dict[str, Optional[str]] = {}
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        record = orjson.loads(line)
+        response = record.get("response") or {}
+        if response.get("status_code") == 200:
+            replies[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+
+    for index, last_user_message in pending:
+        state = states[index]
+        intent_analysis = _parse_json_reply(replies.get(f"intent-{index}"))
+        if intent_analysis is None:
+            append_fallback(state, last_user_message, state["messages"])
+        else:
+            state["user_intent"] = intent_analysis.get('intent', 'general_inquiry')
+            state["conversation_context"].update(intent_analysis.get('context_changes', {}))
+            append_intent_response(state, last_user_message, state["messages"])
+        state["next_step"] = route_by_intent(state)
+
+    return states
@@ -4,30 +4,37 @@ Handles natural language conversation and coordinates calendar operations.
 """
 
 import os
-import json
+import asyncio
+import hashlib
+import random
+import time
+import orjson
 import re
-from typing import Dict, List, Any, Optional
+from string import Template
+from typing import Annotated, Dict, List, Optional, Tuple, TypedDict
 from datetime import datetime, timedelta
+import httpx
+import openai
+from openai import AsyncOpenAI
 from langchain_openai import ChatOpenAI
-from langchain.schema import HumanMessage, AIMessage
+from langchain.schema import HumanMessage, SystemMessage
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolExecutor
-from langchain.tools import tool
-from pydantic import BaseModel, Field
 import logging
+import threading
 from functools import lru_cache
+from cachetools import LRUCache
+from diskcache import Cache
 
-from backend.agent.tools import (
-    check_calendar_availability,
-    suggest_time_slots,
-    book_appointment,
-    get_next_available_slots,
-    parse_date_preference
+from backend.utils.calendar import (
+    get_calendar_manager,
+    get_cached_next_available_slots,
+    get_cached_suggested_slots,
+    invalidate_cached_slots
 )
+from backend.utils.date_parser import IST, parse_date_preference, parse_iso_datetime
 
 # Import enhanced response templates
 from backend.agent.responses import (
-    greeting_response,
     general_greeting,
     slot_suggestion,
     booking_confirmation,
@@ -41,59 +48,248 @@ from backend.agent.responses import (
     slot_selection_confirmation
 )
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the application (see setup_logging in backend.main)
 logger = logging.getLogger(__name__)
 
-# Simple cache for LLM responses
-llm_cache = {}
+# LLM response cache tiers: bounded exact-match LRU, then a persistent exact-match
+# disk cache shared across restarts and workers
+llm_cache = LRUCache(maxsize=1024)
+llm_cache_lock = threading.Lock()
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".llm_cache")
+# Replies resolve relative days ("tomorrow") to dates, so entries are scoped to the IST day
+# they were made on; a day's disk entries are useless after it and are dropped
+LLM_DISK_CACHE_TTL = 24 * 60 * 60
 
-def get_cached_llm_response(prompt: str, cache_key: str = None):
-    """Get cached LLM response or make new request."""
+# Intent classification is a small structured task, so a small fast model suffices
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+# Room for the full intent JSON (context_changes, follow-up questions, entities); a reply
+# cut off at the cap is invalid JSON and lands in the keyword fallback
+LLM_MAX_TOKENS = 400
+
+# OpenAI JSON mode: the model only emits syntactically valid JSON
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+@lru_cache(maxsize=1)
+def get_llm_disk_cache() -> Cache:
+    """Get the on-disk LLM response cache, opened on first use."""
+    return Cache(LLM_CACHE_DIR)
+
+def _disk_cache_key(namespace: str, day: str, prompt: str, system_prompt: Optional[str]) -> str:
+    """Hash everything that shapes a completion, so a model, setting or day change misses."""
+    llm = get_llm()
+    payload = orjson.dumps([llm.model_name, llm.temperature, llm.max_tokens, namespace, day, system_prompt, prompt])
+    return hashlib.sha256(payload).hexdigest()
+
+async def get_cached_llm_response(prompt: str, cache_key: str = None, namespace: str = "default",
+                                  system_prompt: Optional[str] = None, json_reply: bool = False):
+    """Get cached LLM response or make new request.
+    
+    Args:
+        prompt: User prompt sent to the LLM
+        cache_key: In-memory cache key (defaults to the prompt)
+        namespace: Cache namespace, so different prompt types never match each other
+        system_prompt: Fixed instructions sent ahead of the prompt as a system message
+        json_reply: Request OpenAI JSON mode, and only cache replies that parse, so a
+            truncated reply is asked for again instead of served from the cache
+    """
     if cache_key is None:
-        cache_key = prompt[:100]  # Use first 100 chars as key
+        cache_key = prompt
     
-    if cache_key in llm_cache:
-        return llm_cache[cache_key]
+    today = datetime.now(IST).date().isoformat()
+    exact_key = (namespace, today, cache_key)
+    with llm_cache_lock:
+        cached = llm_cache.get(exact_key)
+    if cached is not None:
+        return cached
     
-    try:
-        response = get_llm().invoke([HumanMessage(content=prompt)])
-        llm_cache[cache_key] = response.content
+    disk_key = _disk_cache_key(namespace, today, prompt, system_prompt)
+    cached = get_llm_disk_cache().get(disk_key)
+    if cached is not None:
+        with llm_cache_lock:
+            llm_cache[exact_key] = cached
+        return cached
+    
+    # OpenAI errors propagate so callers can tell transient failures from permanent ones
+    messages = [HumanMessage(content=prompt)]
+    if system_prompt:
+        messages.insert(0, SystemMessage(content=system_prompt))
+    llm = get_llm().bind(response_format=JSON_RESPONSE_FORMAT) if json_reply else get_llm()
+    response = await llm.ainvoke(messages)
+    if json_reply and not _is_json(response.content):
         return response.content
-    except Exception as e:
-        logger.error(f"LLM request failed: {e}")
-        return None
+    
+    get_llm_disk_cache().set(disk_key, response.content, expire=LLM_DISK_CACHE_TTL)
+    with llm_cache_lock:
+        llm_cache[exact_key] = response.content
+    return response.content
+
+def _is_json(content: Optional[str]) -> bool:
+    """Return True if content is a well-formed JSON document."""
+    try:
+        orjson.loads(content or "")
+    except orjson.JSONDecodeError:
+        return False
+    return True
 
-# Initialize OpenAI model lazily
+# Initialize OpenAI model lazily, once per process
+@lru_cache(maxsize=1)
 def get_llm():
-    """Get the OpenAI LLM instance."""
+    """Get the shared OpenAI LLM instance.
+    
+    The async client wraps one keep-alive HTTP/2 connection pool, so LLM calls
+    after the first skip the TCP/TLS handshake.
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    async_client = AsyncOpenAI(
+        api_key=api_key,
+        timeout=30,
+        max_retries=0,  # understand_intent_node retries transient errors itself
+        http_client=httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+        )
+    )
     return ChatOpenAI(
-        model="gpt-3.5-turbo",
+        model=OPENAI_MODEL,
         temperature=0.1,
-        api_key=os.getenv("OPENAI_API_KEY"),
+        api_key=api_key,
         request_timeout=30,  # 30 second timeout
-        max_tokens=150,  # Limit response length for faster processing
-        streaming=False  # Disable streaming for faster responses
+        max_tokens=LLM_MAX_TOKENS,
+        streaming=False,  # Disable streaming for faster responses
+        async_client=async_client.chat.completions
     )
 
-class AgentState(BaseModel):
-    """Enhanced state for the booking agent conversation."""
-    messages: List[Dict] = Field(default_factory=list)
-    current_step: str = Field(default="greeting")
-    user_intent: Optional[str] = Field(default=None)
-    appointment_details: Dict = Field(default_factory=dict)
-    available_slots: List[Dict] = Field(default_factory=list)
-    booking_confirmed: bool = Field(default=False)
-    error_message: Optional[str] = Field(default=None)
-    conversation_context: Dict = Field(default_factory=dict)  # Track conversation context
-    user_preferences: Dict = Field(default_factory=dict)  # Store user preferences
-    validation_errors: List[str] = Field(default_factory=list)  # Track validation errors
-    session_id: Optional[str] = Field(default=None)  # Session tracking
-    simple_greeting: bool = Field(default=False)  # Flag for simple greetings
-    auto_selected_slot: bool = Field(default=False)  # Flag for auto-selected slots
+# Keywords answered directly, without an LLM round trip
+SIMPLE_GREETINGS = (
+    'hi', 'hello', 'hey', 'good morning', 'good afternoon', 'good evening', 'howdy',
+    'greetings', 'hi there', 'hello there', 'hey there', 'good day', 'morning', 'afternoon',
+    'evening', 'sup', 'yo', 'what\'s up', 'how are you', 'how\'s it going'
+)
+
+HELP_KEYWORDS = (
+    'help', 'what can you do', 'how does this work', 'show me examples', 'guide me',
+    'instructions', 'tutorial', 'how to', 'what are your features', 'capabilities',
+    'assist me', 'support', 'manual', 'guide', 'explain', 'tell me about'
+)
 
+GOODBYE_KEYWORDS = (
+    'bye', 'goodbye', 'thanks', 'thank you', 'see you', 'that\'s all', 'end',
+    'finish', 'done', 'complete', 'exit', 'quit', 'stop', 'no more', 'that\'s it',
+    'appreciate it', 'thanks a lot', 'thank you so much', 'see you later',
+    'talk to you later', 'catch you later', 'take care', 'have a good day'
+)
+
+_SIMPLE_GREETING_SET = frozenset(SIMPLE_GREETINGS)
+
+def _keyword_pattern(keywords: Tuple[str, ...]) -> re.Pattern:
+    """Compile keywords into one whole-word alternation, longest phrases first."""
+    alternatives = sorted(keywords, key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(map(re.escape, alternatives)) + r")\b")
+
+# Checked in priority order: the first matching category wins
+_KEYWORD_PATTERNS = (
+    ("greeting", _keyword_pattern(SIMPLE_GREETINGS)),
+    ("help", _keyword_pattern(HELP_KEYWORDS)),
+    ("goodbye", _keyword_pattern(GOODBYE_KEYWORDS))
+)
+
+_KEYWORD_RESPONSES = {
+    "greeting": general_greeting,
+    "help": help_response,
+    "goodbye": goodbye_response
+}
+
+def _classify_keywords(lowered: str) -> Optional[str]:
+    """Return the keyword category found in a lowercased message, if any.
+    
+    Keywords and phrases must match whole words, so "end" does not fire on "weekend".
+    """
+    if lowered in _SIMPLE_GREETING_SET:
+        return "greeting"
+    
+    for category, pattern in _KEYWORD_PATTERNS:
+        if pattern.search(lowered):
+            return category
+    return None
+
+# Nodes only read the latest user message, so older turns are dropped from the state
+MAX_STATE_MESSAGES = 24
+
+def _add_messages(messages: List[Dict], new_messages: List[Dict]) -> List[Dict]:
+    """Concatenate a node's new messages, keeping only the last MAX_STATE_MESSAGES."""
+    return (messages + new_messages)[-MAX_STATE_MESSAGES:]
+
+class AgentState(TypedDict, total=False):
+    """Enhanced state for the booking agent conversation.
+    
+    A plain TypedDict so nodes mutate and return it directly instead of
+    re-serializing a model on every node boundary. Use new_agent_state()
+    to build one with every field populated.
+    
+    LangGraph concatenates messages (through _add_messages, which bounds the
+    window), so nodes never append to it in place; they return their new
+    replies through _emit().
+    """
+    messages: Annotated[List[Dict], _add_messages]  # Nodes return only the messages they add
+    current_step: str
+    user_intent: Optional[str]
+    appointment_details: Dict
+    available_slots: List[Dict]
+    booking_confirmed: bool
+    error_message: Optional[str]
+    conversation_context: Dict  # Track conversation context
+    user_preferences: Dict  # Store user preferences
+    validation_errors: List[str]  # Track validation errors
+    session_id: Optional[str]  # Session tracking
+    simple_greeting: bool  # Flag for simple greetings
+    auto_selected_slot: bool  # Flag for auto-selected slots
+    next_step: str  # Node understand_intent routes to
+    last_user_message: Optional[str]  # Set once per turn by greeting_node
+    selected_slot_times: Optional[tuple]  # Parsed (start, end) of appointment_details' slot
+
+def new_agent_state(**fields) -> AgentState:
+    """Create an AgentState with defaults for every field not given."""
+    state: AgentState = {
+        "messages": [],
+        "current_step": "greeting",
+        "user_intent": None,
+        "appointment_details": {},
+        "available_slots": [],
+        "booking_confirmed": False,
+        "error_message": None,
+        "conversation_context": {},
+        "user_preferences": {},
+        "validation_errors": [],
+        "session_id": None,
+        "simple_greeting": False,
+        "auto_selected_slot": False,
+        "next_step": "end",
+        "last_user_message": None,
+        "selected_slot_times": None
+    }
+    state.update(fields)
+    return state
+
+def _emit(state: AgentState, replies: List[Dict]) -> AgentState:
+    """Build a node's update: every field as-is, but only the new messages."""
+    return {**state, "messages": replies}
+
+def last_user_msg(state: AgentState) -> Optional[str]:
+    """Return the content of the most recent user message, or None.
+    
+    Scans back from the end, so it stays correct when _add_messages drops
+    older turns; the latest user message is normally within the last few.
+    """
+    return next((m["content"] for m in reversed(state["messages"]) if m["role"] == "user"), None)
+
+@lru_cache(maxsize=1)
 def create_booking_agent():
-    """Create the LangGraph booking agent."""
+    """Create the LangGraph booking agent.
+    
+    The graph is static, so it is compiled once and the same instance is
+    returned on every call.
+    """
     
     # Define the state graph
     workflow = StateGraph(AgentState)
@@ -114,7 +310,7 @@ def create_booking_agent():
     # Fixed routing logic - check if user message exists before going to understand_intent
     workflow.add_conditional_edges(
         "greeting",
-        lambda state: "handle_error" if state.get('error_message') else ("understand_intent" if any(msg.get('role') == 'user' for msg in state.get('messages', [])) else "end"),
+        lambda state: "handle_error" if state["error_message"] else ("understand_intent" if state["last_user_message"] is not None else "end"),
         {
             "understand_intent": "understand_intent",
             "handle_error": "handle_error",
@@ -124,18 +320,17 @@ def create_booking_agent():
     
     workflow.add_conditional_edges(
         "understand_intent",
-        lambda state: "handle_error" if state.get('error_message') else ("end" if state.get('simple_greeting', False) else ("suggest_slots" if state.get('user_intent') == "check_availability" else "collect_details")),
+        lambda state: state["next_step"],
         {
             "collect_details": "collect_details",
             "suggest_slots": "suggest_slots",
-            "handle_error": "handle_error",
             "end": END
         }
     )
     
     workflow.add_conditional_edges(
         "collect_details",
-        lambda state: "handle_error" if state.get('error_message') else ("check_availability" if state.get('appointment_details', {}).get('target_date') else "suggest_slots"),
+        lambda state: "handle_error" if state["error_message"] else ("check_availability" if state["appointment_details"].get('target_date') else "suggest_slots"),
         {
             "check_availability": "check_availability",
             "suggest_slots": "suggest_slots",
@@ -145,7 +340,7 @@ def create_booking_agent():
     
     workflow.add_conditional_edges(
         "check_availability",
-        lambda state: "handle_error" if state.get('error_message') else ("book_appointment" if state.get('auto_selected_slot', False) else ("confirm_booking" if state.get('available_slots') else "end")),
+        lambda state: "handle_error" if state["error_message"] else ("book_appointment" if state["auto_selected_slot"] else ("confirm_booking" if state["available_slots"] else "end")),
         {
             "confirm_booking": "confirm_booking",
             "book_appointment": "book_appointment",
@@ -156,7 +351,7 @@ def create_booking_agent():
     
     workflow.add_conditional_edges(
         "suggest_slots",
-        lambda state: "handle_error" if state.get('error_message') else ("confirm_booking" if state.get('available_slots') else "end"),
+        lambda state: "handle_error" if state["error_message"] else ("confirm_booking" if state["available_slots"] else "end"),
         {
             "confirm_booking": "confirm_booking",
             "handle_error": "handle_error",
@@ -195,451 +390,479 @@ def create_booking_agent():
 
 def greeting_node(state: AgentState) -> AgentState:
     """Handle initial greeting and introduction."""
+    replies: List[Dict] = []
+    # Resolve the last user message once; later nodes read the field
+    state["last_user_message"] = last_user_msg(state)
+    
     # Only add greeting if there are no user messages yet
-    if not any(msg.get('role') == 'user' for msg in state.messages):
+    if state["last_user_message"] is None:
         # Use enhanced greeting response
         greeting_message = general_greeting()
         
-        state.messages.append({
+        replies.append({
             "role": "assistant",
             "content": greeting_message
         })
     
-    return state.model_dump()
+    return _emit(state, replies)
 
-def extract_entities(text: str) -> Dict[str, Any]:
-    """Extract entities from natural language text using LLM."""
-    try:
-        entity_prompt = f"""Extract from: "{text}"
-Return ONLY a valid JSON object in this exact format:
-{{"date": "YYYY-MM-DD or null", "time": "HH:MM or null", "duration": "minutes or null", "title": "purpose or null", "urgency": "High/Medium/Low or null", "participants": "number or null"}}
+# Fixed system prompt; only the user's message is sent as the human turn
+INTENT_SYSTEM_PROMPT = """Classify the user's message for a calendar assistant. Reply with JSON only:
+{"intent": "schedule|check_availability|general_inquiry|modify|cancel|clarification",
+ "confidence": "High|Medium|Low",
+ "context_changes": {"date": "YYYY-MM-DD|null", "time": "HH:MM|null", "duration": "minutes|null", "title": "str|null", "urgency": "High|Medium|Low|null", "participants": "count|null"},
+ "follow_up_needed": ["question"],
+ "entities": {"date_mentioned": bool, "time_mentioned": bool, "duration_mentioned": bool, "specific_request": bool}}
+Intents:
+- schedule: book/create a meeting, including vague requests ("i want to meet", "book something")
+- check_availability: asks about free time or open slots
+- modify: change an existing appointment
+- cancel: cancel/delete an appointment
+- clarification: confused or needs more information
+- general_inquiry: anything else about capabilities"""
 
-If no specific information is found, use "null" for that field."""
-        
-        response_content = get_cached_llm_response(entity_prompt, f"entities_{text[:50]}")
-        if response_content and response_content.strip():
-            try:
-                entities = json.loads(response_content)
-                logger.info(f"Extracted entities: {entities}")
-                return entities
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON decode error in entity extraction: {e}")
-                return {}
-        else:
-            logger.warning(f"Empty response from LLM for entity extraction: {text}")
-            return {}
-    except Exception as e:
-        logger.error(f"Error extracting entities: {e}")
-        return {}
+# Furthest ahead an appointment can be booked
+_MAX_FUTURE = timedelta(days=365)
 
-def validate_appointment_request(details: Dict) -> List[str]:
-    """Validate appointment request details."""
-    errors = []
-    
-    # Date validation
-    if 'target_date' in details:
-        try:
-            target_date = datetime.fromisoformat(details['target_date'])
-            if target_date < datetime.now():
-                errors.append("Cannot book appointments in the past")
-            if target_date > datetime.now() + timedelta(days=365):
-                errors.append("Cannot book appointments more than 1 year in advance")
-        except:
-            errors.append("Invalid date format")
-    
-    # Time validation
-    if 'start_hour' in details:
-        hour = details['start_hour']
-        if hour < 0 or hour > 23:
-            errors.append("Invalid hour (must be 0-23)")
-        if hour < 9 or hour > 17:
-            errors.append("Appointments only available during business hours (9 AM - 5 PM)")
-    
-    # Duration validation
-    if 'duration' in details:
-        duration = details.get('duration', 60)
-        if duration < 15 or duration > 480:
-            errors.append("Duration must be between 15 minutes and 8 hours")
-    
-    return errors
+# Intent patterns that are unambiguous enough to skip the LLM
+_INTENT_PATTERNS = (
+    ("schedule", re.compile(r'\b(schedule|book|set up|arrange)\b.*\b(meeting|appointment|call|slot)\b', re.I)),
+    ("check_availability", re.compile(r'\b(availability|free|open|free slots?)\b', re.I)),
+    ("modify", re.compile(r'\b(reschedule|move|change)\b', re.I)),
+    ("cancel", re.compile(r'\b(cancel|delete|remove)\b', re.I))
+)
+
+def _classify_intent_locally(message: str) -> Optional[str]:
+    """Return the intent when exactly one pattern matches, otherwise None."""
+    matches = [intent for intent, pattern in _INTENT_PATTERNS if pattern.search(message)]
+    return matches[0] if len(matches) == 1 else None
+
+# Day phrases parse_date_preference resolves exactly; anything else it defaults to tomorrow
+_EXPLICIT_DAY_RE = re.compile(
+    r"\b(?:tomorrow|next day|next (?:monday|tuesday|wednesday|thursday|friday|saturday|sunday))\b",
+    re.IGNORECASE
+)
+_SPECIFIC_TIME_RE = re.compile(r"specific time \((\d{2}:\d{2})\)")
 
-def understand_intent_node(state: AgentState) -> AgentState:
-    """Enhanced intent understanding with perfect ChatGPT-like conversation flow."""
-    if not state.messages:
-        return state.model_dump()
+def _extract_context_locally(message: str) -> Dict[str, str]:
+    """Date and time a message states explicitly, in the shape of the LLM's context_changes."""
+    if not _EXPLICIT_DAY_RE.search(message):
+        return {}
     
-    # Get the last user message
-    last_user_message = None
-    for msg in reversed(state.messages):
-        if msg["role"] == "user":
-            last_user_message = msg["content"]
-            break
+    parsed = parse_date_preference(message)
+    context = {'date': parsed['target_date']}
+    time_match = _SPECIFIC_TIME_RE.match(parsed['time_preference'])
+    if time_match:
+        context['time'] = time_match.group(1)
+    return context
+
+def append_intent_response(state: AgentState, last_user_message: str, replies: List[Dict]) -> None:
+    """Append the reply for the intent stored on the state."""
+    if state["user_intent"] == "schedule":
+        response_msg = generate_scheduling_response(state, last_user_message)
+    elif state["user_intent"] == "check_availability":
+        response_msg = generate_availability_response(state, last_user_message)
+    elif state["user_intent"] == "modify":
+        response_msg = generate_modify_response(state, last_user_message)
+    elif state["user_intent"] == "cancel":
+        response_msg = generate_cancel_response(state, last_user_message)
+    elif state["user_intent"] == "clarification":
+        response_msg = generate_clarification_response(state, last_user_message)
+    else:
+        response_msg = generate_general_response(state, last_user_message)
     
-    if not last_user_message:
-        return state.model_dump()
+    replies.append({
+        "role": "assistant",
+        "content": response_msg
+    })
+
+def append_fallback(state: AgentState, last_user_message: str, replies: List[Dict]) -> None:
+    """Reply with a keyword-based guess when the intent LLM gives no usable answer."""
+    lowered = last_user_message.lower()
+    if any(word in lowered for word in ['meet', 'book', 'schedule', 'appointment', 'meeting']):
+        response_msg = generate_scheduling_response(state, last_user_message)
+    elif any(word in lowered for word in ['availability', 'free', 'when', 'time', 'slot']):
+        response_msg = generate_availability_response(state, last_user_message)
+    else:
+        response_msg = generate_fallback_response(last_user_message)
     
-    # Enhanced simple greetings detection with variations
-    simple_greetings = [
-        'hi', 'hello', 'hey', 'good morning', 'good afternoon', 'good evening', 'howdy',
-        'greetings', 'hi there', 'hello there', 'hey there', 'good day', 'morning', 'afternoon',
-        'evening', 'sup', 'yo', 'what\'s up', 'how are you', 'how\'s it going'
-    ]
-    if any(greeting in last_user_message.lower().strip() for greeting in simple_greetings):
-        response_msg = general_greeting()
-        
-        state.messages.append({
-            "role": "assistant",
-            "content": response_msg
-        })
-        
-        state.simple_greeting = True
-        return state.model_dump()
+    replies.append({
+        "role": "assistant",
+        "content": response_msg
+    })
+
+# Messages that name a day or clock time, worth prefetching calendar slots for
+_DATE_TIME_HINT_RE = re.compile(
+    r"\b(?:today|tomorrow|tonight|next week|this week|monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+    r"|\d{1,2}(?::\d{2})?\s*(?:am|pm))\b",
+    re.IGNORECASE
+)
+
+def _prefetch_slots(message: str) -> Optional[List[Dict]]:
+    """Fetch suggested slots for a message, or None if the calendar is unavailable."""
+    calendar_manager = get_calendar_manager()
+    if calendar_manager is None:
+        return None
+    return get_cached_suggested_slots(calendar_manager, message)
+
+def route_by_intent(state: AgentState) -> str:
+    """Pick the node that follows understand_intent for the classified intent."""
+    return "suggest_slots" if state["user_intent"] == "check_availability" else "collect_details"
+
+def answer_locally(state: AgentState, last_user_message: str, replies: List[Dict]) -> bool:
+    """Answer keyword messages and unambiguous requests without the LLM.
     
-    # Enhanced help requests detection
-    help_keywords = [
-        'help', 'what can you do', 'how does this work', 'show me examples', 'guide me',
-        'instructions', 'tutorial', 'how to', 'what are your features', 'capabilities',
-        'assist me', 'support', 'manual', 'guide', 'explain', 'tell me about'
-    ]
-    if any(keyword in last_user_message.lower() for keyword in help_keywords):
-        response_msg = help_response()
+    Returns True if a reply was appended and next_step set.
+    """
+    # Greetings, help requests and goodbyes are answered without the LLM
+    lowered = last_user_message.lower().strip()
+    keyword_category = _classify_keywords(lowered)
+    if keyword_category:
+        response_msg = _KEYWORD_RESPONSES[keyword_category]()
         
-        state.messages.append({
+        replies.append({
             "role": "assistant",
             "content": response_msg
         })
         
-        state.simple_greeting = True
-        return state.model_dump()
+        state["simple_greeting"] = True
+        state["next_step"] = "end"
+        return True
     
-    # Enhanced goodbye detection
-    goodbye_keywords = [
-        'bye', 'goodbye', 'thanks', 'thank you', 'see you', 'that\'s all', 'end',
-        'finish', 'done', 'complete', 'exit', 'quit', 'stop', 'no more', 'that\'s it',
-        'appreciate it', 'thanks a lot', 'thank you so much', 'see you later',
-        'talk to you later', 'catch you later', 'take care', 'have a good day'
-    ]
-    if any(keyword in last_user_message.lower() for keyword in goodbye_keywords):
-        response_msg = goodbye_response()
-        
-        state.messages.append({
-            "role": "assistant",
-            "content": response_msg
-        })
-        
-        state.simple_greeting = True
-        return state.model_dump()
+    # Unambiguous requests are classified locally without an LLM round trip
+    fast_intent = _classify_intent_locally(last_user_message)
+    if fast_intent:
+        state["user_intent"] = fast_intent
+        # Fill in what the LLM would have extracted, so the reply can name the day and time
+        state["conversation_context"].update(_extract_context_locally(last_user_message))
+        append_intent_response(state, last_user_message, replies)
+        logger.info("Intent classified locally: %s", fast_intent)
+        state["next_step"] = route_by_intent(state)
+        return True
     
-    # Enhanced intent analysis with context for non-greeting messages
-    intent_prompt = f"""Analyze the following user message and determine the user's intent for a calendar assistant. Consider the full context and be very precise.
-
-User Message: "{last_user_message}"
-
-Return ONLY a valid JSON object in this exact format:
-{{
-  "intent": "schedule|check_availability|general_inquiry|modify|cancel|clarification",
-  "confidence": "High|Medium|Low",
-  "context_changes": {{
-    "date": "YYYY-MM-DD or null",
-    "time": "HH:MM or null", 
-    "duration": "minutes or null",
-    "title": "meeting purpose or null",
-    "urgency": "High|Medium|Low or null"
-  }},
-  "follow_up_needed": ["specific questions needed"],
-  "entities": {{
-    "date_mentioned": "boolean",
-    "time_mentioned": "boolean", 
-    "duration_mentioned": "boolean",
-    "specific_request": "boolean"
-  }}
-}}
-
-Rules:
-- "schedule": User wants to book/create an appointment (includes vague requests like "i want to meet", "book something", "schedule a meeting")
-- "check_availability": User wants to see available times/slots (includes "what's my availability", "show me free slots", "when are you free")
-- "modify": User wants to change existing appointment
-- "cancel": User wants to cancel/delete appointment  
-- "clarification": User needs more information or is confused
-- "general_inquiry": General question about capabilities
-
-IMPORTANT: If the user says something vague like "i want to meet" or "book something", classify as "schedule" intent.
-If the user asks about availability, free time, or when you're free, classify as "check_availability" intent.
-
-Be very precise and consider natural language variations."""
+    return False
 
+async def understand_intent_node(state: AgentState) -> AgentState:
+    """Enhanced intent understanding with perfect ChatGPT-like conversation flow.
+    
+    Sets next_step so the outgoing edge is a single field read.
+    """
+    replies: List[Dict] = []
+    state["next_step"] = "end"
+    if not state["messages"]:
+        return _emit(state, replies)
+    
+    # Get the last user message
+    last_user_message = state["last_user_message"]
+    
+    if not last_user_message:
+        return _emit(state, replies)
+    
+    if answer_locally(state, last_user_message, replies):
+        return _emit(state, replies)
+    
+    # Speculatively fetch calendar slots alongside the LLM calls when a day or time is named
+    calendar_task = None
+    if _DATE_TIME_HINT_RE.search(last_user_message):
+        calendar_task = asyncio.create_task(asyncio.to_thread(_prefetch_slots, last_user_message))
+    
+    # Only transient API errors are retried; a reply that isn't usable JSON goes
+    # straight to the keyword fallback rather than paying for another round trip
     max_retries = 3
     for attempt in range(max_retries + 1):
         try:
-            response_content = get_cached_llm_response(intent_prompt, f"intent_{last_user_message[:50]}_{attempt}")
-            logger.info(f"LLM intent response (attempt {attempt}): {response_content}")
+            response_content = await get_cached_llm_response(
+                last_user_message, namespace="intent", system_prompt=INTENT_SYSTEM_PROMPT, json_reply=True
+            )
+            logger.info("LLM intent response (attempt %s): %s", attempt, response_content)
             
-            if response_content and response_content.strip():
-                try:
-                    intent_analysis = json.loads(response_content)
-                    state.user_intent = intent_analysis.get('intent', 'general_inquiry')
-                    state.conversation_context.update(intent_analysis.get('context_changes', {}))
-                    
-                    # Extract additional entities using the enhanced extractor
-                    entities = extract_entities(last_user_message)
-                    state.conversation_context.update(entities)
-                    
-                    # Generate perfect response based on intent and context
-                    if state.user_intent == "schedule":
-                        response_msg = generate_scheduling_response(state, last_user_message)
-                    elif state.user_intent == "check_availability":
-                        response_msg = generate_availability_response(state, last_user_message)
-                    elif state.user_intent == "modify":
-                        response_msg = generate_modify_response(state, last_user_message)
-                    elif state.user_intent == "cancel":
-                        response_msg = generate_cancel_response(state, last_user_message)
-                    elif state.user_intent == "clarification":
-                        response_msg = generate_clarification_response(state, last_user_message)
-                    else:
-                        response_msg = generate_general_response(state, last_user_message)
-                    
-                    state.messages.append({
-                        "role": "assistant",
-                        "content": response_msg
-                    })
-                    
-                    logger.info(f"Intent understood: {state.user_intent} with confidence: {intent_analysis.get('confidence', 'Unknown')}")
-                    break
-                    
-                except json.JSONDecodeError as e:
-                    logger.error(f"JSON decode error on attempt {attempt}: {e}")
-                    if attempt == max_retries:
-                        # Enhanced fallback logic for common cases
-                        if any(word in last_user_message.lower() for word in ['meet', 'book', 'schedule', 'appointment', 'meeting']):
-                            response_msg = generate_scheduling_response(state, last_user_message)
-                        elif any(word in last_user_message.lower() for word in ['availability', 'free', 'when', 'time', 'slot']):
-                            response_msg = generate_availability_response(state, last_user_message)
-                        else:
-                            response_msg = generate_fallback_response(last_user_message)
-                        
-                        state.messages.append({
-                            "role": "assistant",
-                            "content": response_msg
-                        })
-                    continue
-            else:
-                if attempt == max_retries:
-                    # Enhanced fallback logic for empty responses
-                    if any(word in last_user_message.lower() for word in ['meet', 'book', 'schedule', 'appointment', 'meeting']):
-                        response_msg = generate_scheduling_response(state, last_user_message)
-                    elif any(word in last_user_message.lower() for word in ['availability', 'free', 'when', 'time', 'slot']):
-                        response_msg = generate_availability_response(state, last_user_message)
-                    else:
-                        response_msg = generate_fallback_response(last_user_message)
-                    
-                    state.messages.append({
-                        "role": "assistant",
-                        "content": response_msg
-                    })
-                continue
-                
-        except Exception as e:
-            logger.error(f"Error in intent understanding (attempt {attempt}): {e}")
-            if attempt == max_retries:
-                # Enhanced fallback logic for exceptions
-                if any(word in last_user_message.lower() for word in ['meet', 'book', 'schedule', 'appointment', 'meeting']):
-                    response_msg = generate_scheduling_response(state, last_user_message)
-                elif any(word in last_user_message.lower() for word in ['availability', 'free', 'when', 'time', 'slot']):
-                    response_msg = generate_availability_response(state, last_user_message)
-                else:
-                    response_msg = generate_fallback_response(last_user_message)
+            try:
+                intent_analysis = orjson.loads(response_content or "")
+            except orjson.JSONDecodeError as e:
+                logger.error("JSON decode error in intent response: %s", e)
+                append_fallback(state, last_user_message, replies)
+                break
+            
+            state["user_intent"] = intent_analysis.get('intent', 'general_inquiry')
+            # context_changes also carries the extracted meeting details
+            state["conversation_context"].update(intent_analysis.get('context_changes', {}))
+            
+            # Generate perfect response based on intent and context
+            append_intent_response(state, last_user_message, replies)
+            
+            logger.info("Intent understood: %s with confidence: %s", state['user_intent'], intent_analysis.get('confidence', 'Unknown'))
+            break
                 
-                state.messages.append({
-                    "role": "assistant",
-                    "content": response_msg
-                })
+        except (openai.RateLimitError, openai.APIConnectionError) as e:
+            if isinstance(e, openai.APITimeoutError) or attempt == max_retries:
+                logger.error("Error in intent understanding (attempt %s): %s", attempt, e)
+                append_fallback(state, last_user_message, replies)
+                break
+            logger.warning("Transient LLM error, retrying (attempt %s): %s", attempt, e)
+            await asyncio.sleep(0.5 * 2 ** attempt)
             continue
+        
+        except Exception as e:
+            # Auth failures, bad requests and the like won't succeed on retry
+            logger.error("Error in intent understanding (attempt %s): %s", attempt, e)
+            append_fallback(state, last_user_message, replies)
+            break
+    
+    if calendar_task is not None:
+        if state["user_intent"] == "schedule":
+            # Reused by check_availability_node for the same message
+            try:
+                slots = await calendar_task
+            except Exception as e:
+                logger.warning("Slot prefetch failed: %s", e)
+                slots = None
+            if slots is not None:
+                state["conversation_context"]["_prefetched_slots"] = {
+                    "message": last_user_message,
+                    "slots": slots
+                }
+        else:
+            calendar_task.cancel()
     
-    return state.model_dump()
+    state["next_step"] = route_by_intent(state)
+    return _emit(state, replies)
+
+# Static replies for the intent responses below
+_SCHEDULE_NO_DATE_MSG = (
+    "I'd be happy to help you schedule an appointment! 📅\n\n"
+    "**When would you like to meet?** You can be as specific or general as you'd like:\n\n"
+    "**📅 Specific dates:**\n"
+    "• 'tomorrow at 2 PM'\n"
+    "• 'next Friday morning'\n"
+    "• 'Monday, July 1st at 3:30 PM'\n\n"
+    "**⏰ General preferences:**\n"
+    "• 'any time this week'\n"
+    "• 'morning slots next week'\n"
+    "• 'afternoon availability'\n\n"
+    "**🎯 Flexible options:**\n"
+    "• 'find me a good time'\n"
+    "• 'when are you free?'\n"
+    "• 'suggest some times'\n\n"
+    "**What works best for you?** I'll find the perfect slot! 😊"
+)
+
+_CHECK_AVAIL_MSG = (
+    "I'll check my availability for you right now! 🔍\n\n"
+    "Let me look at my calendar and find the best time slots for you.\n\n"
+    "**I'm searching for:**\n"
+    "• 📅 Available time slots\n"
+    "• ⏰ Best meeting times\n"
+    "• 🎯 Optimal scheduling options\n\n"
+    "Just a moment while I analyze my schedule... ⏳"
+)
+
+_MODIFY_MSG = (
+    "I can help you modify your appointment! 🔄\n\n"
+    "**What changes would you like to make?** You can:\n\n"
+    "**📅 Date & Time:**\n"
+    "• Change the date: 'move it to next Friday'\n"
+    "• Change the time: 'make it 3 PM instead'\n"
+    "• Change both: 'reschedule for Monday at 2 PM'\n\n"
+    "**📝 Details:**\n"
+    "• Update the meeting title\n"
+    "• Adjust the duration\n"
+    "• Add or modify description\n\n"
+    "**What would you like to modify?** I'll help you make the changes right away! ✨"
+)
+
+_CANCEL_MSG = (
+    "I can help you cancel your appointment! ❌\n\n"
+    "**Which appointment would you like to cancel?** Please let me know:\n\n"
+    "**📅 By date and time:**\n"
+    "• 'Cancel my meeting on Friday at 2 PM'\n"
+    "• 'Cancel tomorrow's appointment'\n\n"
+    "**📝 By title:**\n"
+    "• 'Cancel the team meeting'\n"
+    "• 'Cancel my consultation'\n\n"
+    "**🔍 I can help you find it:**\n"
+    "• 'Show me my upcoming appointments'\n"
+    "• 'What meetings do I have this week?'\n\n"
+    "**Just let me know which one, and I'll cancel it right away!** 🗑️"
+)
+
+_CLARIFICATION_MSG = (
+    "I want to make sure I understand exactly what you need! 🤔\n\n"
+    "**Could you give me a bit more detail?** For example:\n\n"
+    "**📅 For scheduling:**\n"
+    "• 'I need to schedule a meeting for tomorrow afternoon'\n"
+    "• 'Can you book me for next Friday at 2 PM?'\n"
+    "• 'I'm looking for a 30-minute slot this week'\n\n"
+    "**🔍 For availability:**\n"
+    "• 'What's free on Tuesday?'\n"
+    "• 'Show me my schedule for next week'\n"
+    "• 'Do I have time available this afternoon?'\n\n"
+    "**💡 For general help:**\n"
+    "• 'What can you help me with?'\n"
+    "• 'How does this work?'\n\n"
+    "**Just tell me what you need, and I'll make it happen!** ✨"
+)
+
+_GENERAL_INQUIRY_MSG = (
+    "I'm here to help you with all your scheduling needs! 🤝\n\n"
+    "**What would you like to do?**\n\n"
+    "**📅 Book an appointment:**\n"
+    "• \"Schedule a meeting for tomorrow afternoon\"\n"
+    "• \"Book me for next Friday at 2 PM\"\n"
+    "• \"I need a 30-minute slot this week\"\n\n"
+    "**🔍 Check availability:**\n"
+    "• \"What's my availability this week?\"\n"
+    "• \"Show me free slots for Friday\"\n"
+    "• \"When are you free next week?\"\n\n"
+    "**💡 Get suggestions:**\n"
+    "• \"Find me a good time next week\"\n"
+    "• \"What's the best slot for a 1-hour meeting?\"\n"
+    "• \"Suggest some times that work\"\n\n"
+    "**🔄 Manage appointments:**\n"
+    "• \"Modify my meeting on Friday\"\n"
+    "• \"Cancel tomorrow's appointment\"\n\n"
+    "**Just tell me what you need in natural language, and I'll guide you through it!** 😊"
+)
+
+_FALLBACK_MSG = (
+    "I'd love to help you with that! 🤝\n\n"
+    "**Could you tell me a bit more about what you need?** For example:\n\n"
+    "**📅 For scheduling:**\n"
+    "• \"I need to schedule a meeting for tomorrow afternoon\"\n"
+    "• \"Can you book me for next Friday at 2 PM?\"\n"
+    "• \"I'm looking for a 30-minute slot this week\"\n\n"
+    "**🔍 For availability:**\n"
+    "• \"What's free on Tuesday?\"\n"
+    "• \"Show me my schedule for next week\"\n"
+    "• \"Do I have time available this afternoon?\"\n\n"
+    "**💡 For general help:**\n"
+    "• \"What can you help me with?\"\n"
+    "• \"How does this work?\"\n\n"
+    "**Just tell me what you need, and I'll make it happen!** ✨"
+)
+
+_SCHEDULE_NO_TIME_MSG = Template(
+    "Perfect! I see you want to meet on **$formatted_date**. 📅\n\n"
+    "**What time works best for you?** You can be specific or flexible:\n\n"
+    "**⏰ Specific times:**\n"
+    "• '2 PM' or '3:30 PM'\n"
+    "• 'morning' or 'afternoon'\n"
+    "• 'early morning' or 'late afternoon'\n\n"
+    "**🎯 Flexible options:**\n"
+    "• 'any available time'\n"
+    "• 'when are you free?'\n"
+    "• 'find the best slot'\n\n"
+    "Let me know what works for you, and I'll check my availability! 🔍"
+)
+
+_SCHEDULE_CHECKING_MSG = Template(
+    "Excellent! I understand you want to meet on **$formatted_date** at **$time_str**. 🎯\n\n"
+    "Let me check my availability and find the best slot for you! 🔍\n\n"
+    "**I'll look for:**\n"
+    "• 📅 Date: $formatted_date\n"
+    "• ⏰ Time: $time_str\n"
+    "• ⏱️ Duration: $duration minutes\n\n"
+    "Just a moment while I check my calendar... ⏳"
+)
 
 def generate_scheduling_response(state: AgentState, user_message: str) -> str:
     """Generate perfect scheduling response based on context."""
-    context = state.conversation_context
+    context = state["conversation_context"]
     
-    if not context.get('date'):
-        return (
-            "I'd be happy to help you schedule an appointment! 📅\n\n"
-            "**When would you like to meet?** You can be as specific or general as you'd like:\n\n"
-            "**📅 Specific dates:**\n"
-            "• 'tomorrow at 2 PM'\n"
-            "• 'next Friday morning'\n"
-            "• 'Monday, July 1st at 3:30 PM'\n\n"
-            "**⏰ General preferences:**\n"
-            "• 'any time this week'\n"
-            "• 'morning slots next week'\n"
-            "• 'afternoon availability'\n\n"
-            "**🎯 Flexible options:**\n"
-            "• 'find me a good time'\n"
-            "• 'when are you free?'\n"
-            "• 'suggest some times'\n\n"
-            "**What works best for you?** I'll find the perfect slot! 😊"
-        )
-    elif not context.get('time'):
-        date_str = context.get('date')
-        try:
-            date_obj = datetime.fromisoformat(date_str)
-            formatted_date = date_obj.strftime('%A, %B %d, %Y')
-        except:
-            formatted_date = date_str
-            
-        return (
-            f"Perfect! I see you want to meet on **{formatted_date}**. 📅\n\n"
-            f"**What time works best for you?** You can be specific or flexible:\n\n"
-            f"**⏰ Specific times:**\n"
-            f"• '2 PM' or '3:30 PM'\n"
-            f"• 'morning' or 'afternoon'\n"
-            f"• 'early morning' or 'late afternoon'\n\n"
-            f"**🎯 Flexible options:**\n"
-            f"• 'any available time'\n"
-            f"• 'when are you free?'\n"
-            f"• 'find the best slot'\n\n"
-            f"Let me know what works for you, and I'll check my availability! 🔍"
-        )
-    else:
-        date_str = context.get('date')
-        time_str = context.get('time')
-        try:
-            date_obj = datetime.fromisoformat(date_str)
-            formatted_date = date_obj.strftime('%A, %B %d, %Y')
-        except:
-            formatted_date = date_str
-            
-        return (
-            f"Excellent! I understand you want to meet on **{formatted_date}** at **{time_str}**. 🎯\n\n"
-            f"Let me check my availability and find the best slot for you! 🔍\n\n"
-            f"**I'll look for:**\n"
-            f"• 📅 Date: {formatted_date}\n"
-            f"• ⏰ Time: {time_str}\n"
-            f"• ⏱️ Duration: {context.get('duration', 60)} minutes\n\n"
-            f"Just a moment while I check my calendar... ⏳"
-        )
+    date_str = context.get('date')
+    if not date_str:
+        return _SCHEDULE_NO_DATE_MSG
+    
+    try:
+        formatted_date = datetime.fromisoformat(date_str).strftime('%A, %B %d, %Y')
+    except (TypeError, ValueError):
+        formatted_date = date_str
+    
+    time_str = context.get('time')
+    if not time_str:
+        return _SCHEDULE_NO_TIME_MSG.substitute(formatted_date=formatted_date)
+    
+    return _SCHEDULE_CHECKING_MSG.substitute(
+        formatted_date=formatted_date,
+        time_str=time_str,
+        duration=context.get('duration', 60)
+    )
 
 def generate_availability_response(state: AgentState, user_message: str) -> str:
     """Generate perfect availability response."""
-    return (
-        "I'll check my availability for you right now! 🔍\n\n"
-        "Let me look at my calendar and find the best time slots for you.\n\n"
-        "**I'm searching for:**\n"
-        "• 📅 Available time slots\n"
-        "• ⏰ Best meeting times\n"
-        "• 🎯 Optimal scheduling options\n\n"
-        "Just a moment while I analyze my schedule... ⏳"
-    )
+    return _CHECK_AVAIL_MSG
 
 def generate_modify_response(state: AgentState, user_message: str) -> str:
     """Generate perfect modify response."""
-    return (
-        "I can help you modify your appointment! 🔄\n\n"
-        "**What changes would you like to make?** You can:\n\n"
-        "**📅 Date & Time:**\n"
-        "• Change the date: 'move it to next Friday'\n"
-        "• Change the time: 'make it 3 PM instead'\n"
-        "• Change both: 'reschedule for Monday at 2 PM'\n\n"
-        "**📝 Details:**\n"
-        "• Update the meeting title\n"
-        "• Adjust the duration\n"
-        "• Add or modify description\n\n"
-        "**What would you like to modify?** I'll help you make the changes right away! ✨"
-    )
+    return _MODIFY_MSG
 
 def generate_cancel_response(state: AgentState, user_message: str) -> str:
     """Generate perfect cancel response."""
-    return (
-        "I can help you cancel your appointment! ❌\n\n"
-        "**Which appointment would you like to cancel?** Please let me know:\n\n"
-        "**📅 By date and time:**\n"
-        "• 'Cancel my meeting on Friday at 2 PM'\n"
-        "• 'Cancel tomorrow's appointment'\n\n"
-        "**📝 By title:**\n"
-        "• 'Cancel the team meeting'\n"
-        "• 'Cancel my consultation'\n\n"
-        "**🔍 I can help you find it:**\n"
-        "• 'Show me my upcoming appointments'\n"
-        "• 'What meetings do I have this week?'\n\n"
-        "**Just let me know which one, and I'll cancel it right away!** 🗑️"
-    )
+    return _CANCEL_MSG
 
 def generate_clarification_response(state: AgentState, user_message: str) -> str:
     """Generate perfect clarification response."""
-    return (
-        "I want to make sure I understand exactly what you need! 🤔\n\n"
-        "**Could you give me a bit more detail?** For example:\n\n"
-        "**📅 For scheduling:**\n"
-        "• 'I need to schedule a meeting for tomorrow afternoon'\n"
-        "• 'Can you book me for next Friday at 2 PM?'\n"
-        "• 'I'm looking for a 30-minute slot this week'\n\n"
-        "**🔍 For availability:**\n"
-        "• 'What's free on Tuesday?'\n"
-        "• 'Show me my schedule for next week'\n"
-        "• 'Do I have time available this afternoon?'\n\n"
-        "**💡 For general help:**\n"
-        "• 'What can you help me with?'\n"
-        "• 'How does this work?'\n\n"
-        "**Just tell me what you need, and I'll make it happen!** ✨"
-    )
+    return _CLARIFICATION_MSG
 
 def generate_general_response(state: AgentState, user_message: str) -> str:
     """Generate perfect general response."""
-    return (
-        "I'm here to help you with all your scheduling needs! 🤝\n\n"
-        "**What would you like to do?**\n\n"
-        "**📅 Book an appointment:**\n"
-        "• \"Schedule a meeting for tomorrow afternoon\"\n"
-        "• \"Book me for next Friday at 2 PM\"\n"
-        "• \"I need a 30-minute slot this week\"\n\n"
-        "**🔍 Check availability:**\n"
-        "• \"What's my availability this week?\"\n"
-        "• \"Show me free slots for Friday\"\n"
-        "• \"When are you free next week?\"\n\n"
-        "**💡 Get suggestions:**\n"
-        "• \"Find me a good time next week\"\n"
-        "• \"What's the best slot for a 1-hour meeting?\"\n"
-        "• \"Suggest some times that work\"\n\n"
-        "**🔄 Manage appointments:**\n"
-        "• \"Modify my meeting on Friday\"\n"
-        "• \"Cancel tomorrow's appointment\"\n\n"
-        "**Just tell me what you need in natural language, and I'll guide you through it!** 😊"
-    )
+    return _GENERAL_INQUIRY_MSG
 
 def generate_fallback_response(user_message: str) -> str:
     """Generate perfect fallback response when intent understanding fails."""
-    return (
-        "I'd love to help you with that! 🤝\n\n"
-        "**Could you tell me a bit more about what you need?** For example:\n\n"
-        "**📅 For scheduling:**\n"
-        "• \"I need to schedule a meeting for tomorrow afternoon\"\n"
-        "• \"Can you book me for next Friday at 2 PM?\"\n"
-        "• \"I'm looking for a 30-minute slot this week\"\n\n"
-        "**🔍 For availability:**\n"
-        "• \"What's free on Tuesday?\"\n"
-        "• \"Show me my schedule for next week\"\n"
-        "• \"Do I have time available this afternoon?\"\n\n"
-        "**💡 For general help:**\n"
-        "• \"What can you help me with?\"\n"
-        "• \"How does this work?\"\n\n"
-        "**Just tell me what you need, and I'll make it happen!** ✨"
-    )
+    return _FALLBACK_MSG
+
+_COLLECT_DETAILS_GUIDE = (
+    "I'd love to help you schedule that appointment! 🤝\n\n"
+    "**Could you please be more specific about the time?** Here are some examples:\n\n"
+    "• **'tomorrow afternoon'** (1 PM - 5 PM)\n"
+    "• **'next Friday morning'** (9 AM - 12 PM)\n"
+    "• **'3 PM next week'** (specific time)\n"
+    "• **'Monday at 2:30 PM'** (specific day and time)\n"
+    "• **'any time this week'** (flexible)\n\n"
+    "**What works best for you?** Just let me know when you'd like to meet!"
+)
+
+_COLLECT_DETAILS_CHECKING = (
+    "Let me check my availability for you and show you the best options! 🔍\n\n"
+    "I'll find several time slots that work for you, and you can choose the one that fits your schedule best."
+)
+
+_COLLECT_DETAILS_URGENT = (
+    "\n\n💡 **I notice this seems urgent** - I'll prioritize finding you a slot as soon as possible!"
+)
+
+_COLLECT_DETAILS_PARTICIPANTS = (
+    "\n\n💡 **For a meeting with $participants participants**, I'll ensure we have enough time allocated."
+)
+
+def _build_collect_details_templates() -> Dict[tuple, Template]:
+    """Precompile the confirmation reply for every (has_start_hour, suggestion) shape."""
+    templates = {}
+    for has_start_hour in (False, True):
+        for suggestion, tail in ((None, ""), ("urgent", _COLLECT_DETAILS_URGENT),
+                                 ("participants", _COLLECT_DETAILS_PARTICIPANTS)):
+            templates[(has_start_hour, suggestion)] = Template(
+                "Perfect! I understand you're looking for **$time_pref** on **$target_date**.\n\n"
+                + ("**Proposed time:** ${start_hour}:00\n\n" if has_start_hour else "")
+                + _COLLECT_DETAILS_CHECKING
+                + tail
+            )
+    return templates
+
+_COLLECT_DETAILS_TEMPLATES = _build_collect_details_templates()
 
 def collect_details_node(state: AgentState) -> AgentState:
     """Collect and parse appointment details from user input."""
+    replies: List[Dict] = []
     try:
-        if not state.messages:
-            return state.model_dump()
+        if not state["messages"]:
+            return _emit(state, replies)
         
         # Get the last user message
-        last_user_message = None
-        for msg in reversed(state.messages):
-            if msg["role"] == "user":
-                last_user_message = msg["content"]
-                break
+        last_user_message = state["last_user_message"]
         
         if not last_user_message:
-            return state.model_dump()
+            return _emit(state, replies)
         
         # Parse appointment details using the parse_date_preference tool
         try:
@@ -647,123 +870,194 @@ def collect_details_node(state: AgentState) -> AgentState:
             
             if parsed_info and 'target_date' in parsed_info:
                 # Update appointment details with parsed information
-                state.appointment_details.update(parsed_info)
-                state.appointment_details['parsed_input'] = last_user_message
+                state["appointment_details"].update(parsed_info)
+                state["appointment_details"]['parsed_input'] = last_user_message
                 
                 # Store user preferences
                 if 'time_preference' in parsed_info:
-                    state.user_preferences['time_preference'] = parsed_info['time_preference']
+                    state["user_preferences"]['time_preference'] = parsed_info['time_preference']
                 if 'target_date' in parsed_info:
-                    state.user_preferences['preferred_date'] = parsed_info['target_date']
+                    state["user_preferences"]['preferred_date'] = parsed_info['target_date']
                 
                 # Generate detailed confirmation message
                 target_date = parsed_info.get('target_date', 'a date')
                 time_pref = parsed_info.get('time_preference', 'a time slot')
                 start_hour = parsed_info.get('start_hour', 'TBD')
                 
-                response_msg = (
-                    f"Perfect! I understand you're looking for **{time_pref}** "
-                    f"on **{target_date}**.\n\n"
-                )
-                
-                if start_hour != 'TBD':
-                    response_msg += f"**Proposed time:** {start_hour}:00\n\n"
+                # Add helpful suggestions based on context
+                participants = state["conversation_context"].get('participants')
+                if state["conversation_context"].get('urgency') == 'High':
+                    suggestion = "urgent"
+                elif isinstance(participants, int) and participants > 2:
+                    suggestion = "participants"
+                else:
+                    suggestion = None
                 
-                response_msg += (
-                    "Let me check my availability for you and show you the best options! 🔍\n\n"
-                    "I'll find several time slots that work for you, and you can choose the one that fits your schedule best."
+                template = _COLLECT_DETAILS_TEMPLATES[(start_hour != 'TBD', suggestion)]
+                response_msg = template.substitute(
+                    time_pref=time_pref,
+                    target_date=target_date,
+                    start_hour=start_hour,
+                    participants=participants
                 )
                 
-                # Add helpful suggestions based on context
-                if state.conversation_context.get('urgency') == 'High':
-                    response_msg += "\n\n💡 **I notice this seems urgent** - I'll prioritize finding you a slot as soon as possible!"
-                elif isinstance(state.conversation_context.get('participants'), int) and state.conversation_context.get('participants', 0) > 2:
-                    response_msg += f"\n\n💡 **For a meeting with {state.conversation_context.get('participants')} participants**, I'll ensure we have enough time allocated."
-                
             else:
                 # No specific date found, provide helpful guidance
-                response_msg = (
-                    "I'd love to help you schedule that appointment! 🤝\n\n"
-                    "**Could you please be more specific about the time?** Here are some examples:\n\n"
-                    "• **'tomorrow afternoon'** (1 PM - 5 PM)\n"
-                    "• **'next Friday morning'** (9 AM - 12 PM)\n"
-                    "• **'3 PM next week'** (specific time)\n"
-                    "• **'Monday at 2:30 PM'** (specific day and time)\n"
-                    "• **'any time this week'** (flexible)\n\n"
-                    "**What works best for you?** Just let me know when you'd like to meet!"
-                )
+                response_msg = _COLLECT_DETAILS_GUIDE
             
         except Exception as e:
-            logger.error(f"Error parsing date preference: {e}")
+            logger.error("Error parsing date preference: %s", e)
             # Fallback response for parsing errors
-            response_msg = (
-                "I'd love to help you schedule that appointment! 🤝\n\n"
-                "**Could you please be more specific about the time?** Here are some examples:\n\n"
-                "• **'tomorrow afternoon'** (1 PM - 5 PM)\n"
-                "• **'next Friday morning'** (9 AM - 12 PM)\n"
-                "• **'3 PM next week'** (specific time)\n"
-                "• **'Monday at 2:30 PM'** (specific day and time)\n"
-                "• **'any time this week'** (flexible)\n\n"
-                "**What works best for you?** Just let me know when you'd like to meet!"
-            )
+            response_msg = _COLLECT_DETAILS_GUIDE
         
-        state.messages.append({
+        replies.append({
             "role": "assistant",
             "content": response_msg
         })
         
-        logger.info(f"Collected appointment details: {state.appointment_details}")
+        logger.info("Collected appointment details: %s", state['appointment_details'])
         
     except Exception as e:
-        logger.error(f"Error collecting details: {e}")
-        state.error_message = f"Error collecting details: {str(e)}"
+        logger.error("Error collecting details: %s", e)
+        state["error_message"] = f"Error collecting details: {str(e)}"
+    
+    return _emit(state, replies)
+
+_NO_SLOTS_MSG = Template(
+    "I couldn't find any available slots for **$date_str**. 😔\n\n"
+    "**Don't worry!** Here are some alternatives:\n"
+    "• Try a **different date** (like tomorrow or next week)\n"
+    "• Ask for **morning slots** instead of afternoon\n"
+    "• Request a **shorter meeting** (30 minutes instead of 1 hour)\n\n"
+    "**What would you like to try?** I'm here to help find a time that works for you! 🤝"
+)
+
+_AUTO_SELECTED_MSG = Template(
+    "Perfect! I found the best available slot for your requested time of **$time_pref** on **$date_str**:\n\n"
+    "📅 **Selected:** $time_str ($duration_minutes minutes)\n\n"
+    "**Ready to book this appointment?**\n\n"
+    "**Just say:**\n"
+    "• \"**Yes**\" or \"**Book it**\" to confirm\n"
+    "• \"**No**\" to see other options\n"
+    "• \"**Change**\" to modify the time\n\n"
+    "**I'm ready to schedule this for you!** ✨"
+)
+
+_CALENDAR_UNAVAILABLE_MSG = (
+    "I'm having trouble accessing the calendar right now. 😅\n\n"
+    "**This usually happens when:**\n"
+    "• The calendar is temporarily unavailable\n"
+    "• There's a brief connection issue\n\n"
+    "**Please try again in a few minutes** - I'll be here to help! 🤝"
+)
+
+_CALENDAR_ERROR_MSG = (
+    "I couldn't check availability right now due to a technical issue. 😔\n\n"
+    "**Don't worry!** This is usually temporary. You can:\n"
+    "• **Try again in a few minutes**\n"
+    "• **Contact support** if the issue persists\n"
+    "• **Send me a message** and I'll help you when the system is back up\n\n"
+    "**I apologize for the inconvenience!** 🙏"
+)
+
+_MAX_SHOWN_SLOTS = 8
+
+_UNBOOKABLE_DAY_MSG = Template(
+    "I can't book anything on **$date_str**. 📅\n\n"
+    "Appointments can be made from **today** up to **one year ahead**.\n\n"
+    "**Which other day would work for you?** 😊"
+)
+
+def _is_bookable_day(target_dt: datetime) -> bool:
+    """Return True if target_dt falls between today (IST) and the booking horizon."""
+    today = datetime.now(IST).date()
+    return today <= target_dt.date() <= today + _MAX_FUTURE
+
+def _select_slot(state: AgentState, slot: Dict) -> tuple:
+    """Record slot as the appointment to book and return its parsed (start, end)."""
+    start_dt = parse_iso_datetime(slot['start'])
+    end_dt = parse_iso_datetime(slot['end'])
+    
+    details = state["appointment_details"]
+    details['title'] = f"Appointment - {details.get('parsed_input', 'Meeting')}"
+    details['start_time'] = slot['start']
+    details['end_time'] = slot['end']
+    details['start_hour'] = start_dt.hour
+    details['selected_slot'] = slot
+    state["selected_slot_times"] = (start_dt, end_dt)
+    return start_dt, end_dt
+
+def _slots_reply(state: AgentState, available_slots: List[Dict], date_str: str) -> str:
+    """Store up to _MAX_SHOWN_SLOTS slots on the state and describe them for date_str."""
+    if not available_slots:
+        state["available_slots"] = []
+        return _NO_SLOTS_MSG.substitute(date_str=date_str)
     
-    return state.model_dump()
+    # Use the slots directly from calendar manager (they already have display fields)
+    shown = available_slots[:_MAX_SHOWN_SLOTS]
+    state["available_slots"] = shown
+    return slot_suggestion(shown, date_str)
 
 def check_availability_node(state: AgentState) -> AgentState:
     """Check calendar availability based on collected details."""
+    replies: List[Dict] = []
     try:
-        if not state.appointment_details:
-            state.error_message = "No appointment details available to check availability"
-            return state.model_dump()
+        if not state["appointment_details"]:
+            state["error_message"] = "No appointment details available to check availability"
+            return _emit(state, replies)
         
-        target_date = state.appointment_details.get('target_date')
+        target_date = state["appointment_details"].get('target_date')
         if not target_date:
-            state.error_message = "No target date specified"
-            return state.model_dump()
+            state["error_message"] = "No target date specified"
+            return _emit(state, replies)
+        
+        # Slots are listed per (target date, requested time); the same request again re-shows them
+        last_user_message = state["last_user_message"]
+        parsed_preference = parse_date_preference(last_user_message) if last_user_message else {}
+        slots_key = [target_date, parsed_preference.get('time_preference'), parsed_preference.get('start_hour')]
+        listed = state["conversation_context"].get("_listed_slots")
+        if (listed and listed["key"] == slots_key and not state["auto_selected_slot"]
+                and state["available_slots"] and state["available_slots"] == listed["slots"]):
+            date_str = datetime.fromisoformat(target_date).strftime('%A, %B %d, %Y')
+            replies.append({
+                "role": "assistant",
+                "content": slot_suggestion(state["available_slots"], date_str)
+            })
+            return _emit(state, replies)
+        state["conversation_context"].pop("_listed_slots", None)
         
         # Check availability for the target date using the calendar manager directly
         try:
-            from backend.utils.calendar import GoogleCalendarManager
-            calendar_manager = GoogleCalendarManager(use_service_account=True)
-            if calendar_manager.authenticate():
-                # Parse date without timezone for local date
-                target_dt = datetime.fromisoformat(target_date)
-                
+            # Parse date without timezone for local date
+            target_dt = datetime.fromisoformat(target_date)
+            date_str = target_dt.strftime('%A, %B %d, %Y')  # e.g., "Friday, June 27, 2025"
+            
+            # Past days and days beyond the booking horizon can't have slots; skip the calendar
+            if not _is_bookable_day(target_dt):
+                state["available_slots"] = []
+                response_msg = _UNBOOKABLE_DAY_MSG.substitute(date_str=date_str)
+            elif (calendar_manager := get_calendar_manager()) is not None:
                 # Use suggest_time_slots instead of get_next_available_slots to handle specific times
-                # Get the last user message to pass to suggest_time_slots
-                last_user_message = None
-                for msg in reversed(state.messages):
-                    if msg["role"] == "user":
-                        last_user_message = msg["content"]
-                        break
-                
                 if last_user_message:
-                    available_slots = calendar_manager.suggest_time_slots(last_user_message)
+                    prefetched = state["conversation_context"].pop("_prefetched_slots", None)
+                    if prefetched and prefetched["message"] == last_user_message:
+                        available_slots = prefetched["slots"]
+                    else:
+                        available_slots = get_cached_suggested_slots(calendar_manager, last_user_message)
                     
                     # Check if this is a specific time request and auto-select the best slot
-                    parsed_preference = parse_date_preference(last_user_message)
                     is_specific_time = "specific time" in parsed_preference.get('time_preference', '')
                     
                     if is_specific_time and available_slots:
                         # Auto-select the first (best) slot for specific time requests
                         best_slot = available_slots[0]
-                        start_time_str = best_slot['start']
-                        end_time_str = best_slot['end']
                         
-                        # Parse the selected time
-                        start_dt = datetime.fromisoformat(start_time_str.replace('Z', ''))
-                        end_dt = datetime.fromisoformat(end_time_str.replace('Z', ''))
+                        # Create slot info using the original slot data
+                        slot_info = best_slot.copy()
+                        slot_info['number'] = 1
+                        
+                        # Update appointment details with the selected slot
+                        start_dt, end_dt = _select_slot(state, slot_info)
                         
                         # Use the display fields from the slot if available
                         if 'start_time_display' in best_slot and 'end_time_display' in best_slot:
@@ -773,382 +1067,341 @@ def check_availability_node(state: AgentState) -> AgentState:
                         
                         duration_minutes = best_slot.get('duration_minutes', 60)
                         
-                        # Create slot info using the original slot data
-                        slot_info = best_slot.copy()
-                        slot_info['number'] = 1
-                        
-                        # Update appointment details with the selected slot
-                        state.appointment_details.update({
-                            'title': f"Appointment - {state.appointment_details.get('parsed_input', 'Meeting')}",
-                            'start_time': start_time_str,
-                            'end_time': end_time_str,
-                            'start_hour': start_dt.hour,
-                            'selected_slot': slot_info
-                        })
-                        
                         # Set available slots to just the selected one
-                        state.available_slots = [slot_info]
+                        state["available_slots"] = [slot_info]
                         
                         # Create confirmation message for auto-selected slot
-                        date_str = target_dt.strftime('%A, %B %d, %Y')
-                        response_msg = (
-                            f"Perfect! I found the best available slot for your requested time of **{parsed_preference['time_preference']}** on **{date_str}**:\n\n"
-                            f"📅 **Selected:** {time_str} ({duration_minutes} minutes)\n\n"
-                            f"**Ready to book this appointment?**\n\n"
-                            f"**Just say:**\n"
-                            f"• \"**Yes**\" or \"**Book it**\" to confirm\n"
-                            f"• \"**No**\" to see other options\n"
-                            f"• \"**Change**\" to modify the time\n\n"
-                            f"**I'm ready to schedule this for you!** ✨"
+                        response_msg = _AUTO_SELECTED_MSG.substitute(
+                            time_pref=parsed_preference['time_preference'],
+                            date_str=date_str,
+                            time_str=time_str,
+                            duration_minutes=duration_minutes
                         )
-                        state.auto_selected_slot = True
+                        state["auto_selected_slot"] = True
                     else:
                         # For general requests, show all available slots
-                        if available_slots:
-                            # Use the slots directly from calendar manager (they already have display fields)
-                            state.available_slots = available_slots[:8]  # Show up to 8 slots
-                            
-                            # Create a user-friendly response using the slot_suggestion function
-                            date_str = target_dt.strftime('%A, %B %d, %Y')  # e.g., "Friday, June 27, 2025"
-                            response_msg = slot_suggestion(available_slots[:8], date_str)
-                        else:
-                            state.available_slots = []
-                            response_msg = (
-                                f"I couldn't find any available slots for **{target_dt.strftime('%A, %B %d, %Y')}**. 😔\n\n"
-                                f"**Don't worry!** Here are some alternatives:\n"
-                                f"• Try a **different date** (like tomorrow or next week)\n"
-                                f"• Ask for **morning slots** instead of afternoon\n"
-                                f"• Request a **shorter meeting** (30 minutes instead of 1 hour)\n\n"
-                                f"**What would you like to try?** I'm here to help find a time that works for you! 🤝"
-                            )
+                        response_msg = _slots_reply(state, available_slots, date_str)
                 else:
                     # Fallback to general availability if no user message
-                    available_slots = calendar_manager.get_next_available_slots(target_dt, 8)
-                    
-                    if available_slots:
-                        # Use the slots directly from calendar manager (they already have display fields)
-                        state.available_slots = available_slots[:8]  # Show up to 8 slots
-                        
-                        # Create a user-friendly response using the slot_suggestion function
-                        date_str = target_dt.strftime('%A, %B %d, %Y')  # e.g., "Friday, June 27, 2025"
-                        response_msg = slot_suggestion(available_slots[:8], date_str)
-                    else:
-                        state.available_slots = []
-                        response_msg = (
-                            f"I couldn't find any available slots for **{target_dt.strftime('%A, %B %d, %Y')}**. 😔\n\n"
-                            f"**Don't worry!** Here are some alternatives:\n"
-                            f"• Try a **different date** (like tomorrow or next week)\n"
-                            f"• Ask for **morning slots** instead of afternoon\n"
-                            f"• Request a **shorter meeting** (30 minutes instead of 1 hour)\n\n"
-                            f"**What would you like to try?** I'm here to help find a time that works for you! 🤝"
-                        )
+                    available_slots = get_cached_next_available_slots(calendar_manager, target_dt, _MAX_SHOWN_SLOTS)
+                    response_msg = _slots_reply(state, available_slots, date_str)
+                
+                if state["available_slots"] and not state["auto_selected_slot"]:
+                    state["conversation_context"]["_listed_slots"] = {
+                        "key": slots_key,
+                        "slots": state["available_slots"]
+                    }
             else:
-                state.available_slots = []
-                response_msg = (
-                    "I'm having trouble accessing the calendar right now. 😅\n\n"
-                    "**This usually happens when:**\n"
-                    "• The calendar is temporarily unavailable\n"
-                    "• There's a brief connection issue\n\n"
-                    "**Please try again in a few minutes** - I'll be here to help! 🤝"
-                )
+                state["available_slots"] = []
+                response_msg = _CALENDAR_UNAVAILABLE_MSG
         except Exception as e:
-            logger.error(f"Calendar error: {e}")
-            state.available_slots = []
-            response_msg = (
-                "I couldn't check availability right now due to a technical issue. 😔\n\n"
-                "**Don't worry!** This is usually temporary. You can:\n"
-                "• **Try again in a few minutes**\n"
-                "• **Contact support** if the issue persists\n"
-                "• **Send me a message** and I'll help you when the system is back up\n\n"
-                "**I apologize for the inconvenience!** 🙏"
-            )
+            logger.error("Calendar error: %s", e)
+            state["available_slots"] = []
+            response_msg = _CALENDAR_ERROR_MSG
         
-        state.messages.append({
+        replies.append({
             "role": "assistant",
             "content": response_msg
         })
         
     except Exception as e:
-        logger.error(f"Error in check_availability_node: {e}")
-        state.error_message = f"Error checking availability: {str(e)}"
+        logger.error("Error in check_availability_node: %s", e)
+        state["error_message"] = f"Error checking availability: {str(e)}"
     
-    return state.model_dump()
+    return _emit(state, replies)
 
 def suggest_slots_node(state: AgentState) -> AgentState:
     """Suggest time slots based on user preferences."""
+    replies: List[Dict] = []
     try:
-        if not state.messages:
-            return state.model_dump()
+        if not state["messages"]:
+            return _emit(state, replies)
         
         # Get the last user message
-        last_user_message = None
-        for msg in reversed(state.messages):
-            if msg["role"] == "user":
-                last_user_message = msg["content"]
-                break
+        last_user_message = state["last_user_message"]
         
         if not last_user_message:
-            return state.model_dump()
+            return _emit(state, replies)
         
         # Suggest time slots based on user preference using calendar manager directly
         try:
-            from backend.utils.calendar import GoogleCalendarManager
-            calendar_manager = GoogleCalendarManager(use_service_account=True)
-            if calendar_manager.authenticate():
-                suggested_slots = calendar_manager.suggest_time_slots(last_user_message)
+            calendar_manager = get_calendar_manager()
+            if calendar_manager is not None:
+                suggested_slots = get_cached_suggested_slots(calendar_manager, last_user_message)
                 
                 if suggested_slots:
                     # Use the slots directly from calendar manager (they already have display fields)
-                    state.available_slots = suggested_slots[:5]  # Limit to 5 suggestions
+                    state["available_slots"] = suggested_slots[:5]  # Limit to 5 suggestions
                     
                     # Use enhanced slot suggestion response
-                    date_str = state.appointment_details.get('target_date', '')
+                    date_str = state["appointment_details"].get('target_date', '')
                     if date_str:
                         try:
                             date_obj = datetime.fromisoformat(date_str)
                             date_str = date_obj.strftime('%A, %B %d, %Y')
-                        except:
+                        except (TypeError, ValueError):
                             pass
                     
                     response_msg = slot_suggestion(suggested_slots[:5], date_str)
                 else:
-                    state.available_slots = []
+                    state["available_slots"] = []
                     response_msg = no_availability()
             else:
-                state.available_slots = []
+                state["available_slots"] = []
                 response_msg = error_response("calendar")
         except Exception as e:
-            state.available_slots = []
+            state["available_slots"] = []
             response_msg = error_response("general")
         
-        state.messages.append({
+        replies.append({
             "role": "assistant",
             "content": response_msg
         })
         
     except Exception as e:
-        state.error_message = f"Error suggesting slots: {str(e)}"
+        state["error_message"] = f"Error suggesting slots: {str(e)}"
     
-    return state.model_dump()
+    return _emit(state, replies)
+
+# Slot number selection, e.g. "1", "2", "slot 3"
+_SLOT_NUM_RE = re.compile(r'(?:slot\s+)?(\d+)')
+_TIME_RE = re.compile(r'\b(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\b', re.IGNORECASE)
+
+def _parse_user_time(message: str) -> Optional[Tuple[int, int]]:
+    """Return the first clock time in message (e.g. "2:30 PM", "14:30", "3pm") as 24h (hour, minute)."""
+    for match in _TIME_RE.finditer(message):
+        hour, minute, meridiem = match.groups()
+        if minute is None and meridiem is None:
+            # A bare number is a slot choice, not a time
+            continue
+        hour, minute = int(hour), int(minute or 0)
+        if meridiem:
+            if not 1 <= hour <= 12:
+                continue
+            hour = hour % 12 + (12 if meridiem.lower() == 'pm' else 0)
+        if hour < 24 and minute < 60:
+            return hour, minute
+    return None
+
+# Words that confirm the offered slot
+_CONFIRM_RE = re.compile(r"\b(?:yes|confirm|book|schedule|okay|sure|perfect|that works)\b")
 
 def confirm_booking_node(state: AgentState) -> AgentState:
     """Confirm booking details with user."""
+    replies: List[Dict] = []
     try:
-        if not state.messages:
-            return state.model_dump()
+        if not state["messages"]:
+            return _emit(state, replies)
         
         # Get the last user message
-        last_user_message = None
-        for msg in reversed(state.messages):
-            if msg["role"] == "user":
-                last_user_message = msg["content"]
-                break
+        last_user_message = state["last_user_message"]
         
         if not last_user_message:
-            return state.model_dump()
+            return _emit(state, replies)
+        
+        msg_lower = last_user_message.lower()
         
         # Check if user is selecting a slot from the numbered list
         slot_selected = None
-        if state.available_slots:
-            # Check for slot number selection (e.g., "1", "2", "slot 3")
-            import re
-            slot_match = re.search(r'(?:slot\s+)?(\d+)', last_user_message.lower())
-            if slot_match:
-                slot_num = int(slot_match.group(1))
-                if 1 <= slot_num <= len(state.available_slots):
-                    slot_selected = state.available_slots[slot_num - 1]
+        slot_num = 1
+        if state["available_slots"]:
+            # Check for time selection (e.g., "2:30 PM", "14:30"), compared by hour and minute
+            user_time = _parse_user_time(msg_lower)
+            if user_time is not None:
+                for index, slot in enumerate(state["available_slots"], 1):
+                    start_dt = parse_iso_datetime(slot['start'])
+                    if (start_dt.hour, start_dt.minute) == user_time:
+                        slot_selected, slot_num = slot, index
+                        break
+            else:
+                # Check for slot number selection (e.g., "1", "2", "slot 3")
+                slot_match = _SLOT_NUM_RE.search(msg_lower)
+                if slot_match and 1 <= int(slot_match.group(1)) <= len(state["available_slots"]):
+                    slot_num = int(slot_match.group(1))
+                    slot_selected = state["available_slots"][slot_num - 1]
             
-            # Check for time selection (e.g., "2:30 PM", "14:30")
+            # Nothing picked explicitly: take the first slot, as before
             if not slot_selected:
-                for slot in state.available_slots:
-                    if slot.get('time', '').lower() in last_user_message.lower():
-                        slot_selected = slot
-                        break
+                slot_selected = state["available_slots"][0]
+                slot_num = 1
         
         # Check if user is confirming the booking
-        confirmation_keywords = ["yes", "confirm", "book", "schedule", "okay", "sure", "perfect", "that works"]
-        is_confirming = any(keyword in last_user_message.lower() for keyword in confirmation_keywords)
+        is_confirming = _CONFIRM_RE.search(msg_lower) is not None
         
         if slot_selected:
             # User selected a specific slot
-            target_date = state.appointment_details.get('target_date')
-            start_time_str = slot_selected['start']
-            end_time_str = slot_selected['end']
-            
-            # Parse the selected time
-            start_dt = datetime.fromisoformat(start_time_str)
-            end_dt = datetime.fromisoformat(end_time_str)
-            
-            # Update appointment details
-            state.appointment_details.update({
-                'title': f"Appointment - {state.appointment_details.get('parsed_input', 'Meeting')}",
-                'start_time': start_time_str,
-                'end_time': end_time_str,
-                'start_hour': start_dt.hour,
-                'selected_slot': slot_selected
-            })
+            _select_slot(state, slot_selected)
             
             # Use enhanced slot selection confirmation
-            response_msg = slot_selection_confirmation(
-                slot_num if 'slot_num' in locals() else 1, 
-                slot_selected
-            )
+            response_msg = slot_selection_confirmation(slot_num, slot_selected)
             
         elif is_confirming:
             # User is confirming the booking
-            if state.appointment_details.get('start_time') and state.appointment_details.get('end_time'):
+            if state["appointment_details"].get('start_time') and state["appointment_details"].get('end_time'):
                 response_msg = processing_response()
             else:
                 response_msg = clarification_needed()
         else:
             # User didn't select a slot or confirm - ask for clarification
-            if state.available_slots:
-                response_msg = slot_suggestion(state.available_slots)
+            if state["available_slots"]:
+                response_msg = slot_suggestion(state["available_slots"])
             else:
                 response_msg = clarification_general()
         
-        state.messages.append({
+        replies.append({
             "role": "assistant",
             "content": response_msg
         })
         
     except Exception as e:
-        logger.error(f"Error in confirm_booking_node: {e}")
-        state.error_message = f"Error confirming booking: {str(e)}"
+        logger.error("Error in confirm_booking_node: %s", e)
+        state["error_message"] = f"Error confirming booking: {str(e)}"
     
-    return state.model_dump()
+    return _emit(state, replies)
 
-def book_appointment_node(state: AgentState) -> AgentState:
-    """Actually book the appointment in the calendar."""
+_ALREADY_BOOKED_MSG = (
+    "I've already booked this appointment for you! 😊\n\n"
+    "**Would you like to:**\n"
+    "• Book another appointment?\n"
+    "• Check your calendar?\n"
+    "• Modify this booking?\n\n"
+    "Just let me know how else I can help!"
+)
+
+# Booking retries: exponential backoff with jitter, all within one deadline
+_BOOKING_RETRY_DEADLINE = 5.0
+_BOOKING_BACKOFF_BASE = 0.2
+_BOOKING_BACKOFF_MAX = 2.0
+
+async def _booking_backoff(attempt: int, max_attempts: int, deadline: float) -> bool:
+    """Wait before the next booking attempt; False if no attempt or time is left for one."""
+    if attempt >= max_attempts:
+        return False
+    delay = random.uniform(0, min(_BOOKING_BACKOFF_MAX, _BOOKING_BACKOFF_BASE * 2 ** attempt))
+    if time.monotonic() + delay >= deadline:
+        return False
+    await asyncio.sleep(delay)
+    return True
+
+async def book_appointment_node(state: AgentState) -> AgentState:
+    """Actually book the appointment in the calendar.
+    
+    Calendar calls run in worker threads and backoff waits on the event loop,
+    so a retried booking never blocks a thread while it waits.
+    """
+    replies: List[Dict] = []
     try:
-        if not state.appointment_details:
-            state.error_message = "No appointment details available for booking"
-            return state.model_dump()
+        if not state["appointment_details"]:
+            state["error_message"] = "No appointment details available for booking"
+            return _emit(state, replies)
         
         # Check if we've already booked this appointment
-        if state.booking_confirmed:
-            response_msg = (
-                "I've already booked this appointment for you! 😊\n\n"
-                "**Would you like to:**\n"
-                "• Book another appointment?\n"
-                "• Check your calendar?\n"
-                "• Modify this booking?\n\n"
-                "Just let me know how else I can help!"
-            )
-            state.messages.append({
+        if state["booking_confirmed"]:
+            replies.append({
                 "role": "assistant",
-                "content": response_msg
+                "content": _ALREADY_BOOKED_MSG
             })
-            return state.model_dump()
+            return _emit(state, replies)
 
-        title = state.appointment_details.get('title', 'Appointment')
-        start_time = state.appointment_details.get('start_time')
-        end_time = state.appointment_details.get('end_time')
-        description = state.appointment_details.get('description', '')
+        title = state["appointment_details"].get('title', 'Appointment')
+        start_time = state["appointment_details"].get('start_time')
+        end_time = state["appointment_details"].get('end_time')
+        description = state["appointment_details"].get('description', '')
+        
+        if not (title and start_time and end_time):
+            state["error_message"] = "Missing required appointment details"
+            return _emit(state, replies)
         
-        if not all([title, start_time, end_time]):
-            state.error_message = "Missing required appointment details"
-            return state.model_dump()
+        # Reuse the times parsed when the slot was selected this turn
+        if state["selected_slot_times"] is not None:
+            start_dt, end_dt = state["selected_slot_times"]
+        else:
+            # Parse datetime strings safely
+            try:
+                start_dt = parse_iso_datetime(start_time)
+                end_dt = parse_iso_datetime(end_time)
+            except ValueError as e:
+                logger.error("Invalid datetime format: %s", e)
+                response_msg = error_response("general")
+                replies.append({
+                    "role": "assistant",
+                    "content": response_msg
+                })
+                return _emit(state, replies)
         
-        # Book the appointment using calendar manager directly
+        # Book the appointment using calendar manager directly; book_appointment
+        # classifies every calendar failure, and only transient ones are retried,
+        # with jittered backoff inside a fixed deadline
         max_booking_attempts = 2
+        deadline = time.monotonic() + _BOOKING_RETRY_DEADLINE
         for attempt in range(max_booking_attempts + 1):
-            try:
-                from backend.utils.calendar import GoogleCalendarManager
-                calendar_manager = GoogleCalendarManager(use_service_account=True)
-                if calendar_manager.authenticate():
-                    # Parse datetime strings safely
-                    try:
-                        start_dt = datetime.fromisoformat(start_time)
-                        end_dt = datetime.fromisoformat(end_time)
-                    except ValueError as e:
-                        logger.error(f"Invalid datetime format: {e}")
-                        response_msg = error_response("general")
-                        state.messages.append({
-                            "role": "assistant",
-                            "content": response_msg
-                        })
-                        return state.model_dump()
-                    
-                    # Check if slot is still available before booking
-                    if attempt > 0:
-                        # On retry, check if the slot is still available
-                        available_slots = calendar_manager.get_next_available_slots(start_dt.date(), 1)
-                        slot_still_available = False
-                        for slot in available_slots:
-                            slot_start_str = slot['start']
-                            # Handle timezone suffix properly
-                            if slot_start_str.endswith('Z'):
-                                slot_start_str = slot_start_str[:-1]  # Remove 'Z' suffix
-                            try:
-                                slot_start = datetime.fromisoformat(slot_start_str)
-                                if abs((slot_start - start_dt).total_seconds()) < 300:  # Within 5 minutes
-                                    slot_still_available = True
-                                    break
-                            except ValueError:
-                                continue  # Skip invalid datetime formats
-                        
-                        if not slot_still_available:
-                            response_msg = no_availability()
-                            state.messages.append({
-                                "role": "assistant",
-                                "content": response_msg
-                            })
-                            return state.model_dump()
-                    
-                    result = calendar_manager.book_appointment(title, start_dt, end_dt, description)
-                    
-                    if result['success']:
-                        state.booking_confirmed = True
-                        
-                        # Use enhanced booking confirmation response
-                        booking_details = {
-                            'date': start_dt.strftime('%A, %B %d, %Y'),
-                            'start_time': start_dt.strftime('%I:%M %p'),
-                            'end_time': end_dt.strftime('%I:%M %p'),
-                            'duration': int((end_dt - start_dt).total_seconds() / 60),
-                            'event_id': result['event_id'],
-                            'calendar_link': result.get('event_link', ''),
-                            'time_of_day': 'morning' if start_dt.hour < 12 else 'afternoon' if start_dt.hour < 17 else 'evening'
-                        }
-                        
-                        response_msg = booking_confirmation(booking_details)
-                        
-                        logger.info(f"Appointment booked successfully: {result['event_id']}")
-                        break
-                    else:
-                        if attempt < max_booking_attempts:
-                            logger.warning(f"Booking attempt {attempt + 1} failed: {result['error']}")
-                            continue
-                        else:
-                            response_msg = error_response("booking")
-                else:
-                    if attempt < max_booking_attempts:
-                        logger.warning(f"Calendar authentication failed on attempt {attempt + 1}")
-                        continue
-                    else:
-                        response_msg = error_response("calendar")
-            except Exception as e:
-                logger.error(f"Booking error on attempt {attempt + 1}: {e}")
-                if attempt < max_booking_attempts:
+            calendar_manager = await asyncio.to_thread(get_calendar_manager)
+            if calendar_manager is None:
+                # get_calendar_manager re-authenticates on the next call
+                logger.warning("Calendar authentication failed on attempt %s", attempt + 1)
+                response_msg = error_response("calendar")
+                if await _booking_backoff(attempt, max_booking_attempts, deadline):
                     continue
-                else:
-                    response_msg = error_response("general")
+                break
+            
+            # On retry, check if the slot is still available before booking
+            if attempt > 0:
+                slot_free = await asyncio.to_thread(calendar_manager.is_slot_free, start_dt, end_dt)
+                if slot_free is None:
+                    # The check itself failed transiently; try again
+                    response_msg = error_response("calendar")
+                    if await _booking_backoff(attempt, max_booking_attempts, deadline):
+                        continue
+                    break
+                if not slot_free:
+                    response_msg = no_availability()
+                    break
+            
+            result = await asyncio.to_thread(
+                calendar_manager.book_appointment, title, start_dt, end_dt, description
+            )
+            
+            if result['success']:
+                state["booking_confirmed"] = True
+                invalidate_cached_slots(start_dt)
+                
+                # Use enhanced booking confirmation response
+                booking_details = {
+                    'date': start_dt.strftime('%A, %B %d, %Y'),
+                    'start_time': start_dt.strftime('%I:%M %p'),
+                    'end_time': end_dt.strftime('%I:%M %p'),
+                    'duration': int((end_dt - start_dt).total_seconds() / 60),
+                    'event_id': result['event_id'],
+                    'calendar_link': result.get('event_link', ''),
+                    'time_of_day': 'morning' if start_dt.hour < 12 else 'afternoon' if start_dt.hour < 17 else 'evening'
+                }
+                
+                response_msg = booking_confirmation(booking_details)
+                
+                logger.info("Appointment booked successfully: %s", result['event_id'])
+                break
+            
+            logger.warning("Booking attempt %s failed: %s", attempt + 1, result['error'])
+            response_msg = error_response("booking")
+            if result.get('transient') and await _booking_backoff(attempt, max_booking_attempts, deadline):
+                continue
+            break
         
-        state.messages.append({
+        replies.append({
             "role": "assistant",
             "content": response_msg
         })
         
     except Exception as e:
-        logger.error(f"Error in book_appointment_node: {e}")
-        state.error_message = f"Error booking appointment: {str(e)}"
+        logger.error("Error in book_appointment_node: %s", e)
+        state["error_message"] = f"Error booking appointment: {str(e)}"
     
-    return state.model_dump()
+    return _emit(state, replies)
 
 def handle_error_node(state: AgentState) -> AgentState:
     """Handle errors gracefully."""
-    error_msg = state.error_message or "An unexpected error occurred"
+    replies: List[Dict] = []
+    error_msg = state["error_message"] or "An unexpected error occurred"
     
     # Provide more helpful error messages based on the type of error
     if "intent" in error_msg.lower():
@@ -1160,12 +1413,12 @@ def handle_error_node(state: AgentState) -> AgentState:
     else:
         response_msg = error_response("general")
     
-    state.messages.append({
+    replies.append({
         "role": "assistant",
         "content": response_msg
     })
     
-    return state.model_dump()
+    return _emit(state, replies)
 
 # Create the agent instance
 booking_agent = create_booking_agent() 
\ No newline at end of file
@@ -2,14 +2,49 @@
 Tools for the LangGraph booking agent to interact with Google Calendar.
 """
 
+import threading
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from langchain.tools import tool
 from backend.utils.calendar import GoogleCalendarManager
 from backend.utils.date_parser import parse_date_preference
 
-# Initialize calendar manager
-calendar_manager = GoogleCalendarManager()
+def _slot_info(slot: Dict, default_minutes: int, default_duration: str) -> Dict:
+    """Summarize one calendar slot, reusing the shared duration label when it applies."""
+    minutes = slot['duration_minutes']
+    return {
+        'start': _format_minutes(datetime.fromisoformat(slot['start'])),
+        'end': _format_minutes(datetime.fromisoformat(slot['end'])),
+        'duration': default_duration if minutes == default_minutes else f"{minutes} minutes"
+    }
+
+def _summarize_slots(slots: List[Dict]) -> List[Dict]:
+    """Summarize calendar slots for tool output."""
+    # Slots from one query share a duration, so its label is usually formatted once
+    default_minutes = slots[0]['duration_minutes'] if slots else 60
+    default_duration = f"{default_minutes} minutes"
+    return [_slot_info(slot, default_minutes, default_duration) for slot in slots]
+
+# The tools use their own OAuth manager (the agent nodes share the service-account one)
+_tool_manager: Optional[GoogleCalendarManager] = None
+_tool_manager_lock = threading.Lock()
+
+def _calendar() -> GoogleCalendarManager:
+    """Get the tools' OAuth calendar manager, built on first use rather than at import."""
+    global _tool_manager
+    
+    with _tool_manager_lock:
+        if _tool_manager is None:
+            # The constructor authenticates; keep nothing if that failed so the next call retries
+            manager = GoogleCalendarManager()
+            if manager.service is None:
+                raise RuntimeError("Calendar authentication failed")
+            _tool_manager = manager
+        return _tool_manager
+
+def _format_minutes(dt: datetime) -> str:
+    """Format as 'YYYY-MM-DD HH:MM' using isoformat's C fast path instead of strftime."""
+    return dt.replace(tzinfo=None).isoformat(sep=' ', timespec='minutes')
 
 @tool
 def check_calendar_availability(start_date: str, end_date: str, duration_minutes: int = 60) -> str:
@@ -28,7 +63,7 @@ def check_calendar_availability(start_date: str, end_date: str, duration_minutes
         start_dt = datetime.fromisoformat(start_date)
         end_dt = datetime.fromisoformat(end_date)
         
-        available_slots = calendar_manager.check_availability(
+        available_slots = _calendar().check_availability(
             start_dt, end_dt, duration_minutes
         )
         
@@ -36,15 +71,7 @@ def check_calendar_availability(start_date: str, end_date: str, duration_minutes
             return "No available time slots found for the specified date range."
         
         # Format the response
-        slots_info = []
-        for slot in available_slots:
-            start_time = datetime.fromisoformat(slot['start'])
-            end_time = datetime.fromisoformat(slot['end'])
-            slots_info.append({
-                'start': start_time.strftime('%Y-%m-%d %H:%M'),
-                'end': end_time.strftime('%Y-%m-%d %H:%M'),
-                'duration': f"{slot['duration_minutes']} minutes"
-            })
+        slots_info = _summarize_slots(available_slots)
         
         return f"Available time slots: {slots_info}"
         
@@ -63,21 +90,13 @@ def suggest_time_slots(user_preference: str) -> str:
         JSON string with suggested time slots
     """
     try:
-        suggested_slots = calendar_manager.suggest_time_slots(user_preference)
+        suggested_slots = _calendar().suggest_time_slots(user_preference)
         
         if not suggested_slots:
             return "No available time slots found for your preference."
         
         # Format the response
-        slots_info = []
-        for slot in suggested_slots[:5]:  # Limit to 5 suggestions
-            start_time = datetime.fromisoformat(slot['start'])
-            end_time = datetime.fromisoformat(slot['end'])
-            slots_info.append({
-                'start': start_time.strftime('%Y-%m-%d %H:%M'),
-                'end': end_time.strftime('%Y-%m-%d %H:%M'),
-                'duration': f"{slot['duration_minutes']} minutes"
-            })
+        slots_info = _summarize_slots(suggested_slots[:5])  # Limit to 5 suggestions
         
         return f"Suggested time slots based on '{user_preference}': {slots_info}"
         
@@ -102,7 +121,7 @@ def book_appointment(title: str, start_time: str, end_time: str, description: st
         start_dt = datetime.fromisoformat(start_time)
         end_dt = datetime.fromisoformat(end_time)
         
-        result = calendar_manager.book_appointment(title, start_dt, end_dt, description)
+        result = _calendar().book_appointment(title, start_dt, end_dt, description)
         
         if result['success']:
             return f"Appointment booked successfully! Event ID: {result['event_id']}. " \
@@ -128,21 +147,13 @@ def get_next_available_slots(date: str, count: int = 5) -> str:
     """
     try:
         target_date = datetime.fromisoformat(date)
-        available_slots = calendar_manager.get_next_available_slots(target_date, count)
+        available_slots = _calendar().get_next_available_slots(target_date, count)
         
         if not available_slots:
             return f"No available time slots found for {date}."
         
         # Format the response
-        slots_info = []
-        for slot in available_slots:
-            start_time = datetime.fromisoformat(slot['start'])
-            end_time = datetime.fromisoformat(slot['end'])
-            slots_info.append({
-                'start': start_time.strftime('%Y-%m-%d %H:%M'),
-                'end': end_time.strftime('%Y-%m-%d %H:%M'),
-                'duration': f"{slot['duration_minutes']} minutes"
-            })
+        slots_info = _summarize_slots(available_slots)
         
         return f"Available time slots for {date}: {slots_info}"
         
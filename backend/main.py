@@ -11,6 +11,7 @@ from typing import Dict, List, Optional
 from datetime import datetime
 from fastapi import FastAPI, HTTPException, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field
@@ -25,7 +26,8 @@ from prometheus_client import CollectorRegistry, push_to_gateway
 import logging
 from logging.handlers import RotatingFileHandler
 
-from backend.agent.booking_agent import create_booking_agent, AgentState
+from backend.agent.booking_agent import create_booking_agent, new_agent_state
+from backend.utils.calendar import get_calendar_manager, get_cached_next_available_slots
 
 # Load environment variables
 load_dotenv()
@@ -85,7 +87,7 @@ try:
     redis_client.ping()
     logger.info("Redis connection established")
 except Exception as e:
-    logger.warning(f"Redis not available: {e}")
+    logger.warning("Redis not available: %s", e)
     redis_client = None
 
 # Prometheus metrics
@@ -137,7 +139,8 @@ app = FastAPI(
     description="A conversational AI agent for booking appointments on Google Calendar",
     version="1.0.0",
     docs_url="/docs" if os.getenv("ENVIRONMENT") != "production" else None,
-    redoc_url="/redoc" if os.getenv("ENVIRONMENT") != "production" else None
+    redoc_url="/redoc" if os.getenv("ENVIRONMENT") != "production" else None,
+    default_response_class=ORJSONResponse  # orjson encodes slot lists and replies faster than stdlib json
 )
 
 # Add security middleware
@@ -202,7 +205,7 @@ async def track_requests(request: Request, call_next):
     request.state.request_id = request_id
     
     # Log incoming request
-    logger.info(f"Request {request_id}: {request.method} {request.url.path}")
+    logger.info("Request %s: %s %s", request_id, request.method, request.url.path)
     
     try:
         response = await call_next(request)
@@ -222,11 +225,11 @@ async def track_requests(request: Request, call_next):
         # Add request ID to response headers
         response.headers["X-Request-ID"] = request_id
         
-        logger.info(f"Request {request_id} completed: {response.status_code} in {duration:.3f}s")
+        logger.info("Request %s completed: %s in %.3fs", request_id, response.status_code, duration)
         return response
         
     except Exception as e:
-        logger.error(f"Request {request_id} failed: {str(e)}")
+        logger.error("Request %s failed: %s", request_id, e)
         raise
 
 # Health check endpoint
@@ -261,28 +264,27 @@ async def chat(
         session_id = chat_request.session_id or str(uuid.uuid4())
         
         # Create agent state
-        state = AgentState(
+        state = new_agent_state(
             session_id=session_id,
             user_preferences={}
         )
         
         # Add user message
-        state.messages.append({
+        state["messages"].append({
             "role": "user",
             "content": chat_request.message
         })
         
         # Process with agent
-        logger.info(f"Processing message for session {session_id}: {chat_request.message[:100]}...")
+        logger.info("Processing message for session %s: %s...", session_id, chat_request.message[:100])
         
         # Create the booking agent instance
         booking_agent = create_booking_agent()
-        result = booking_agent.invoke(state.model_dump())
-        state = AgentState(**result)
+        state = await booking_agent.ainvoke(state)
         
         # Get the last assistant message
         assistant_message = None
-        for msg in reversed(state.messages):
+        for msg in reversed(state["messages"]):
             if msg["role"] == "assistant":
                 assistant_message = msg["content"]
                 break
@@ -291,12 +293,12 @@ async def chat(
             assistant_message = "I'm sorry, I couldn't process your request. Please try again."
         
         # Track booking metrics
-        if state.booking_confirmed:
+        if state["booking_confirmed"]:
             BOOKING_COUNT.labels(status="success").inc()
-            logger.info(f"Appointment booked successfully for session {session_id}")
-        elif state.error_message:
+            logger.info("Appointment booked successfully for session %s", session_id)
+        elif state["error_message"]:
             BOOKING_COUNT.labels(status="error").inc()
-            logger.error(f"Error in session {session_id}: {state.error_message}")
+            logger.error("Error in session %s: %s", session_id, state['error_message'])
         
         # Store session data in Redis if available
         if redis_client:
@@ -305,27 +307,27 @@ async def chat(
                     "session_id": session_id,
                     "user_id": chat_request.user_id,
                     "last_activity": datetime.now().isoformat(),
-                    "booking_confirmed": state.booking_confirmed,
-                    "appointment_details": json.dumps(state.appointment_details)
+                    "booking_confirmed": state["booking_confirmed"],
+                    "appointment_details": json.dumps(state["appointment_details"])
                 }
                 redis_client.hset(f"session:{session_id}", mapping=session_data)
                 redis_client.expire(f"session:{session_id}", 3600)  # 1 hour TTL
             except Exception as e:
-                logger.warning(f"Failed to store session data: {e}")
+                logger.warning("Failed to store session data: %s", e)
         
         duration = time.time() - start_time
-        logger.info(f"Chat response generated in {duration:.3f}s for session {session_id}")
+        logger.info("Chat response generated in %.3fs for session %s", duration, session_id)
         
         return ChatResponse(
             response=assistant_message,
             session_id=session_id,
-            booking_confirmed=state.booking_confirmed,
-            appointment_details=state.appointment_details if state.appointment_details else None,
-            error=state.error_message
+            booking_confirmed=state["booking_confirmed"],
+            appointment_details=state["appointment_details"] if state["appointment_details"] else None,
+            error=state["error_message"]
         )
         
     except Exception as e:
-        logger.error(f"Error in chat endpoint: {str(e)}")
+        logger.error("Error in chat endpoint: %s", e)
         BOOKING_COUNT.labels(status="error").inc()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -342,17 +344,15 @@ async def get_availability(
 ):
     """Get calendar availability for a specific date."""
     try:
-        from backend.utils.calendar import GoogleCalendarManager
-        
-        calendar_manager = GoogleCalendarManager(use_service_account=True)
-        if not calendar_manager.authenticate():
+        calendar_manager = get_calendar_manager()
+        if calendar_manager is None:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="Calendar service unavailable"
             )
         
         target_date = datetime.fromisoformat(date)
-        available_slots = calendar_manager.get_next_available_slots(target_date, 10)
+        available_slots = get_cached_next_available_slots(calendar_manager, target_date, 10)
         
         return {
             "date": date,
@@ -366,7 +366,7 @@ async def get_availability(
             detail="Invalid date format. Use YYYY-MM-DD"
         )
     except Exception as e:
-        logger.error(f"Error getting availability: {e}")
+        logger.error("Error getting availability: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error retrieving availability"
@@ -393,7 +393,7 @@ async def get_session(session_id: str):
         return session_data
         
     except Exception as e:
-        logger.error(f"Error retrieving session {session_id}: {e}")
+        logger.error("Error retrieving session %s: %s", session_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error retrieving session"
@@ -5,20 +5,32 @@ Handles authentication, availability checking, and appointment creation.
 
 import os
 import json
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
+from google.auth.exceptions import RefreshError, TransportError
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google.oauth2 import service_account
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+import httplib2
 import pytz
-from backend.utils.date_parser import parse_date_preference
+from cachetools import TTLCache
+from backend.utils.date_parser import IST, parse_date_preference
 
 # If modifying these scopes, delete the file token.json.
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
+# Google API statuses worth retrying: rate limiting and server-side failures
+TRANSIENT_HTTP_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+# Business hours in the calendar's timezone; slots start within [start, end)
+BUSINESS_START_HOUR = 9
+BUSINESS_END_HOUR = 17
+
 def to_rfc3339(dt):
     """Convert datetime to RFC3339 format."""
     if dt.tzinfo is None:
@@ -153,13 +165,25 @@ class GoogleCalendarManager:
         end_date = self._ensure_timezone(end_date)
         
         # Business hours: 9 AM to 5 PM in local timezone
-        business_start = 9
-        business_end = 17
+        business_start = BUSINESS_START_HOUR
+        business_end = BUSINESS_END_HOUR
         
         print(f"   📅 Generating slots from {start_date.strftime('%Y-%m-%d %H:%M %Z')} to {end_date.strftime('%Y-%m-%d %H:%M %Z')}")
         print(f"   📅 Business hours: {business_start}:00 to {business_end}:00 {self.timezone}")
         print(f"   📅 Found {len(events)} existing events")
         
+        # Parse each event's times once, converted to the calendar's timezone,
+        # rather than again for every candidate slot
+        busy_periods = []
+        for event in events:
+            try:
+                busy_periods.append((
+                    self._parse_event_datetime(event['start']),
+                    self._parse_event_datetime(event['end'])
+                ))
+            except Exception as e:
+                print(f"Warning: Could not parse event datetime: {e}")
+        
         current_time = start_date
         
         while current_time < end_date:
@@ -168,20 +192,10 @@ class GoogleCalendarManager:
                 slot_end = current_time + timedelta(minutes=duration_minutes)
                 
                 # Check if this slot conflicts with any existing events
-                is_available = True
-                for event in events:
-                    try:
-                        # Parse event times and convert to calendar's timezone
-                        event_start = self._parse_event_datetime(event['start'])
-                        event_end = self._parse_event_datetime(event['end'])
-                        
-                        # Check for overlap
-                        if (current_time < event_end and slot_end > event_start):
-                            is_available = False
-                            break
-                    except Exception as e:
-                        print(f"Warning: Could not parse event datetime: {e}")
-                        continue
+                is_available = not any(
+                    current_time < event_end and slot_end > event_start
+                    for event_start, event_end in busy_periods
+                )
                 
                 if is_available and slot_end <= end_date:
                     # Create slot with timezone-aware times
@@ -229,11 +243,12 @@ class GoogleCalendarManager:
             description: Description of the appointment
             
         Returns:
-            Dictionary with booking result
+            Dictionary with booking result; failures carry 'transient', True when
+            retrying may succeed (rate limits, server and network errors)
         """
         if not self.service:
             if not self.authenticate():
-                return {'success': False, 'error': 'Authentication failed'}
+                return {'success': False, 'error': 'Authentication failed', 'transient': True}
         
         try:
             # Ensure datetime objects are timezone-aware
@@ -247,14 +262,15 @@ class GoogleCalendarManager:
             print(f"   Calendar ID: {self.calendar_id}")
             print(f"   Timezone: {self.timezone}")
             
-            # Check if the time slot is still available
-            availability = self.check_availability(
-                start_time, 
-                end_time, 
-                int((end_time - start_time).total_seconds() / 60)
-            )
+            # Only slots starting within business hours can be booked
+            if not BUSINESS_START_HOUR <= start_time.hour < BUSINESS_END_HOUR:
+                return {'success': False, 'error': 'Time slot is outside business hours'}
             
-            if not availability:
+            # Check if the time slot is still available
+            slot_free = self.is_slot_free(start_time, end_time)
+            if slot_free is None:
+                return {'success': False, 'error': 'Could not check availability', 'transient': True}
+            if not slot_free:
                 return {'success': False, 'error': 'Time slot no longer available'}
             
             # Create the event with explicit timezone handling
@@ -287,15 +303,72 @@ class GoogleCalendarManager:
             
         except HttpError as error:
             print(f"Error booking appointment: {error}")
-            return {'success': False, 'error': str(error)}
+            return {
+                'success': False,
+                'error': str(error),
+                'transient': error.resp.status in TRANSIENT_HTTP_STATUSES
+            }
+        except (OSError, httplib2.HttpLib2Error, TransportError) as error:
+            # Connection resets, socket timeouts, DNS and token-refresh network failures
+            print(f"Error booking appointment: {error}")
+            return {'success': False, 'error': str(error), 'transient': True}
+        except RefreshError as error:
+            # Revoked or expired credentials; retrying won't help
+            print(f"Error booking appointment: {error}")
+            return {'success': False, 'error': str(error), 'transient': False}
     
-    def get_next_available_slots(self, date: datetime, count: int = 5) -> List[Dict]:
+    def is_slot_free(self, start_time: datetime, end_time: datetime) -> Optional[bool]:
+        """
+        Check whether a single time range has no busy periods.
+        
+        Uses one FreeBusy query bounded to the range instead of listing a whole
+        day of events.
+        
+        Args:
+            start_time: Start of the range
+            end_time: End of the range
+            
+        Returns:
+            True if the calendar is free for the whole range, False if it is busy
+            or the query was rejected, None if a transient failure (rate limit,
+            server, network or authentication error) left it unknown, so callers can retry
+        """
+        if not self.service:
+            if not self.authenticate():
+                return None
+        
+        try:
+            result = self.service.freebusy().query(body={
+                'timeMin': to_rfc3339(self._ensure_timezone(start_time)),
+                'timeMax': to_rfc3339(self._ensure_timezone(end_time)),
+                'items': [{'id': self.calendar_id}]
+            }).execute()
+            
+            calendar = result.get('calendars', {}).get(self.calendar_id, {})
+            if calendar.get('errors'):
+                print(f"Error checking slot: {calendar['errors']}")
+                return False
+            return not calendar.get('busy')
+            
+        except HttpError as error:
+            print(f"Error checking slot: {error}")
+            if error.resp.status in TRANSIENT_HTTP_STATUSES:
+                return None
+            return False
+        except (OSError, httplib2.HttpLib2Error, TransportError) as error:
+            print(f"Error checking slot: {error}")
+            return None
+        except RefreshError as error:
+            print(f"Error checking slot: {error}")
+            return False
+    
+    def get_next_available_slots(self, date: datetime, count: Optional[int] = 5) -> List[Dict]:
         """
         Get the next available time slots for a given date.
         
         Args:
             date: Date to check for availability
-            count: Number of slots to return
+            count: Number of slots to return, or None for every free slot that day
             
         Returns:
             List of available time slots
@@ -434,4 +507,99 @@ class GoogleCalendarManager:
             target_time = target_date.replace(hour=start_hour, minute=0)
             available_slots.sort(key=lambda x: abs(datetime.fromisoformat(x['start']).replace(tzinfo=None) - target_time))
         
-        return available_slots 
\ No newline at end of file
+        return available_slots 
+# Shared service-account manager, re-authenticated every CALENDAR_AUTH_TTL seconds
+CALENDAR_AUTH_TTL = 1800
+
+_shared_manager: Optional[GoogleCalendarManager] = None
+_shared_manager_auth_time = 0.0
+_shared_manager_lock = threading.Lock()
+
+def get_calendar_manager() -> Optional[GoogleCalendarManager]:
+    """
+    Get the shared service-account calendar manager.
+    
+    The manager is built and authenticated once, then reused across requests
+    and re-authenticated after CALENDAR_AUTH_TTL seconds.
+    
+    Returns:
+        The authenticated manager, or None if authentication failed
+    """
+    global _shared_manager, _shared_manager_auth_time
+    
+    with _shared_manager_lock:
+        now = time.monotonic()
+        if _shared_manager is None:
+            # The constructor authenticates; keep nothing if that failed so the next call retries
+            manager = GoogleCalendarManager(use_service_account=True)
+            if manager.service is None:
+                return None
+            _shared_manager = manager
+            _shared_manager_auth_time = now
+        elif now - _shared_manager_auth_time > CALENDAR_AUTH_TTL:
+            if not _shared_manager.authenticate():
+                return None
+            _shared_manager_auth_time = now
+        
+        return _shared_manager
+
+# Every free slot of a day, per day; free/busy rarely changes between two chat turns
+SLOT_CACHE_TTL = 60
+
+_slot_cache = TTLCache(maxsize=512, ttl=SLOT_CACHE_TTL)
+_slot_cache_lock = threading.Lock()
+
+def get_cached_next_available_slots(manager: GoogleCalendarManager, date: datetime,
+                                    count: int = 5) -> List[Dict]:
+    """
+    Get the next available slots for a day, reusing results for SLOT_CACHE_TTL seconds.
+    
+    Args:
+        manager: Authenticated calendar manager used on a cache miss
+        date: Day to check for availability
+        count: Number of slots to return
+        
+    Returns:
+        List of available time slots
+    """
+    with _slot_cache_lock:
+        slots = _slot_cache.get(date.date())
+    if slots is None:
+        # Cache the whole day so callers asking for different counts share one entry
+        slots = manager.get_next_available_slots(date, None)
+        with _slot_cache_lock:
+            _slot_cache[date.date()] = slots
+    return slots[:count]
+
+# Suggested slots per (normalized preference, today); relative phrases like
+# "tomorrow at 3pm" recur across users and resolve the same within a day
+_suggestion_cache = TTLCache(maxsize=512, ttl=SLOT_CACHE_TTL)
+
+def get_cached_suggested_slots(manager: GoogleCalendarManager, user_preference: str) -> List[Dict]:
+    """
+    Suggest slots for a natural language preference, reusing results for SLOT_CACHE_TTL seconds.
+    
+    Args:
+        manager: Authenticated calendar manager used on a cache miss
+        user_preference: Natural language preference (e.g., "tomorrow afternoon")
+        
+    Returns:
+        List of suggested time slots
+    """
+    key = (" ".join(user_preference.lower().split()), datetime.now(IST).date())
+    with _slot_cache_lock:
+        cached = _suggestion_cache.get(key)
+    if cached is not None:
+        return list(cached)
+    
+    slots = manager.suggest_time_slots(user_preference)
+    with _slot_cache_lock:
+        _suggestion_cache[key] = slots
+    return list(slots)
+
+def invalidate_cached_slots(date: datetime) -> None:
+    """Drop every cached slot list for the day of date, e.g. after booking on it."""
+    with _slot_cache_lock:
+        _slot_cache.pop(date.date(), None)
+        # Suggestions can span a whole week, so any of them may include the day
+        _suggestion_cache.clear()
@@ -2,27 +2,50 @@
 Date parsing utilities for the booking agent.
 """
 
-from datetime import datetime, timedelta
+import sys
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
 from typing import Dict
 import re
 import pytz
 
+# Fastest available ISO 8601 parser; all of them accept a trailing 'Z'
+try:
+    from ciso8601 import parse_datetime as parse_iso_datetime
+except ImportError:
+    if sys.version_info >= (3, 11):
+        parse_iso_datetime = datetime.fromisoformat
+    else:
+        def parse_iso_datetime(value: str) -> datetime:
+            """Parse an ISO 8601 timestamp, accepting a trailing 'Z' for UTC."""
+            if value.endswith('Z'):
+                value = value[:-1] + '+00:00'
+            return datetime.fromisoformat(value)
+
+# Relative days ("tomorrow", "next Friday") are resolved in IST
+IST = pytz.timezone('Asia/Kolkata')
+
 def parse_date_preference(user_input: str) -> Dict:
     """
     Parse user's natural language date preference and convert to structured format.
     
+    Results are memoized per normalized input and day, since the same message
+    is parsed by several nodes in one turn.
+    
     Args:
         user_input: Natural language input (e.g., "tomorrow afternoon", "next Friday", "this week")
     
     Returns:
         Dictionary with structured date information
     """
+    normalized = " ".join(user_input.lower().split())
+    return dict(_parse_date_preference(normalized, datetime.now(IST).date()))
+
+@lru_cache(maxsize=2048)
+def _parse_date_preference(user_input_lower: str, today_date: date) -> Dict:
+    """Parse a lowercased, whitespace-normalized preference relative to today_date."""
+    today = IST.localize(datetime.combine(today_date, time()))
     try:
-        # Use IST timezone
-        ist_tz = pytz.timezone('Asia/Kolkata')
-        today = datetime.now(ist_tz)
-        user_input_lower = user_input.lower()
-        
         # Check for availability requests first
         availability_keywords = ['availability', 'available', 'free', 'when', 'time', 'slot', 'schedule']
         is_availability_request = any(keyword in user_input_lower for keyword in availability_keywords)
@@ -17,16 +17,22 @@ setup(
         "langchain==0.1.0",
         "langchain-openai==0.0.5",
         "langgraph==0.0.20",
-        "openai<2.0.0,>=1.10.0",
+        "openai<2.0.0,>=1.17.0",
+        "orjson==3.9.10",
+        "cachetools==5.3.2",
+        "diskcache==5.6.3",
         "google-auth==2.23.4",
         "google-auth-oauthlib==1.1.0",
         "google-auth-httplib2==0.1.1",
         "google-api-python-client==2.108.0",
         "pytz==2023.3",
+        "ciso8601==2.3.1",
         "slowapi==0.1.9",
         "redis==5.0.1",
         "prometheus-client==0.19.0",
-        "python-multipart==0.0.6"
+        "python-multipart==0.0.6",
+        "httpx==0.25.2",
+        "h2==4.1.0"
     ],
     python_requires=">=3.10",
 )
\ No newline at end of file